@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+OutputBackend.py
+MIT License (c) Faure Systems <dev at faure dot systems>
+
+Output backends driving the relay pins of PiRelayApp:
+    GpioBackend: Raspberry Pi GPIO with RPi.GPIO, outputs are BCM numbers
+    Mcp23017Backend: MCP23017 expanders on I2C, outputs are (address, port, bit)
+    SimulatorBackend: in-memory outputs recording timestamped transitions
+
+Each call takes a list of outputs so that a command is applied at once.
+"""
+
+import time
+
+from abc import ABC, abstractmethod
+
+from constants import *
+from mcp23017 import Mcp23017
+
+
+class OutputBackend(ABC):
+
+    name = 'none'
+
+    # __________________________________________________________________
+    @abstractmethod
+    def output(self, outputs, level):
+        pass
+
+    # __________________________________________________________________
+    @abstractmethod
+    def setupInput(self, outputs):
+        pass
+
+    # __________________________________________________________________
+    @abstractmethod
+    def setupOutput(self, outputs, level):
+        pass
+
+
+class GpioBackend(OutputBackend):
+
+    name = 'RPi.GPIO'
+
+    # __________________________________________________________________
+    def __init__(self, gpio):
+        super().__init__()
+
+        self._gpio = gpio
+
+    # __________________________________________________________________
+    def output(self, outputs, level):
+        # RPi.GPIO accepts a channel list, all pins are switched in one call
+        self._gpio.output(outputs, level)
+
+    # __________________________________________________________________
+    def setupInput(self, outputs):
+        self._gpio.setup(outputs, self._gpio.IN)
+
+    # __________________________________________________________________
+    def setupOutput(self, outputs, level):
+        self._gpio.setup(outputs, self._gpio.OUT, initial=level)
+
+
+class Mcp23017Backend(OutputBackend):
+
+    name = 'MCP23017'
+
+    # __________________________________________________________________
+    def __init__(self, bus, addresses):
+        super().__init__()
+
+        self._bus = bus
+        self._addresses = addresses
+        self._expanders = {}
+
+    # __________________________________________________________________
+    def _expander(self, address):
+        if address not in self._expanders:
+            if address not in self._addresses:
+                raise ValueError("MCP23017 address {:#04x} is not configured".format(address))
+            expander = Mcp23017(self._bus, address)
+            expander.reset()
+            self._expanders[address] = expander
+        return self._expanders[address]
+
+    # __________________________________________________________________
+    def _expanderPins(self, outputs):
+        expander_pins = {}
+        for address, port, bit in outputs:
+            expander_pins.setdefault(address, []).append((port, bit))
+        return expander_pins
+
+    # __________________________________________________________________
+    def output(self, outputs, level):
+        # one OLAT write per port of each expander
+        for address, pins in self._expanderPins(outputs).items():
+            self._expander(address).output(pins, level)
+
+    # __________________________________________________________________
+    def setupInput(self, outputs):
+        for address, pins in self._expanderPins(outputs).items():
+            self._expander(address).setupInput(pins)
+
+    # __________________________________________________________________
+    def setupOutput(self, outputs, level):
+        for address, pins in self._expanderPins(outputs).items():
+            self._expander(address).setupOutput(pins, level)
+
+
+class SimulatorBackend(OutputBackend):
+    """Keep output levels in memory and record transitions in a preallocated ring buffer."""
+
+    name = 'simulator'
+
+    # __________________________________________________________________
+    def __init__(self, capacity=SIMULATOR_CAPACITY):
+        super().__init__()
+
+        self._capacity = capacity
+        self._count = 0
+        self._times = [0.0] * capacity
+        self._outputs = [None] * capacity
+        self._levels = bytearray(capacity)
+        self._state = {}
+
+    # __________________________________________________________________
+    def _record(self, output, level):
+        i = self._count % self._capacity
+        self._times[i] = time.perf_counter()
+        self._outputs[i] = output
+        self._levels[i] = level
+        self._count += 1
+
+    # __________________________________________________________________
+    def count(self):
+        # transitions recorded since start, including those overwritten in the ring
+        return self._count
+
+    # __________________________________________________________________
+    def level(self, output):
+        return self._state.get(output)
+
+    # __________________________________________________________________
+    def output(self, outputs, level):
+        state = self._state
+        for output in outputs:
+            if output in state and state[output] != level:
+                state[output] = level
+                self._record(output, level)
+
+    # __________________________________________________________________
+    def setupInput(self, outputs):
+        for output in outputs:
+            self._state.pop(output, None)
+
+    # __________________________________________________________________
+    def setupOutput(self, outputs, level):
+        for output in outputs:
+            if self._state.get(output) != level:
+                self._state[output] = level
+                self._record(output, level)
+
+    # __________________________________________________________________
+    def transitions(self):
+        # oldest first, as (perf_counter time, output, level)
+        first = max(0, self._count - self._capacity)
+        return [(self._times[i % self._capacity], self._outputs[i % self._capacity], self._levels[i % self._capacity])
+                for i in range(first, self._count)]
@@ -16,26 +16,46 @@ wiring:
 board:
     Pi: bare Raspberry Pi
     Pi MCP23017: Raspberry Pi with MCP23017 expander
+
+The text protocol is always served on the inbox, the compact binary protocol
+(see RelayBinary.py) is served on the binary inbox. Binary DATA frames are
+published once a binary frame has been received, binary commands tagged with
+another wiring than the current one are answered with OMIT.
 """
 
 import os
 import json
-import time
 import asyncio
 
 from AsyncioProp import AsyncioProp
+from OutputBackend import GpioBackend, Mcp23017Backend, SimulatorBackend
 from PropData import PropData
 from PropPin import PropPin
+from RelayBank import RelayBank
+from RelayBinary import FRAME_DATA_REQUEST, decodeCommand, encodeData, wiringTag
+from RelayCommand import parseRelayCommand
+import StartupProfile
+from WiringStore import WiringStore
 from constants import *
 
+# each output backend falls back to the simulator on its own, only if its module failed to import
+GPIO = None
+_gpioImportError = None
 if USE_GPIO and os.path.isfile('/opt/vc/include/bcm_host.h'):
-    import RPi.GPIO as GPIO
+    try:
+        import RPi.GPIO as GPIO
+    except (ImportError, RuntimeError) as e:
+        _gpioImportError = e
 
+smbus = None
+_smbusImportError = None
 try:
     MCP23017_ADDRESS
     from mcp23017 import *
-    import smbus
-    #bus = smbus.SMBus(1)
+    try:
+        import smbus
+    except ImportError as e:
+        _smbusImportError = e
 except NameError:
     pass
 
@@ -48,6 +68,12 @@ class PiRelayApp(AsyncioProp):
 
         self._pinPropData = {}
         self._propPins = {}
+        self._variableOutputs = {}
+        self._groupOutputs = {}
+        self._wiringStore = WiringStore(WIRING_JSON_FILE, self._logger)
+        self._wiringOutputs = []  # output of each wiring JSON entry (binary pin index), None if not set up
+        self._wiringTag = wiringTag([])  # wiring the binary pin indexes refer to
+        self._binaryPeer = False
 
         try:
             MCP23017_ADDRESS
@@ -55,6 +81,15 @@ class PiRelayApp(AsyncioProp):
         except NameError:
             self._mcp23017 = False
 
+        if self._mcp23017:
+            # MCP23017_ADDRESS is an address or a tuple of addresses, the first one for 'MCP23017_GPIOxn' pins
+            if isinstance(MCP23017_ADDRESS, int):
+                self._mcp23017Addresses = (MCP23017_ADDRESS,)
+            else:
+                self._mcp23017Addresses = tuple(MCP23017_ADDRESS)
+
+        self._createOutputBackends()
+
         if self._mcp23017:
             board_initial = BOARD_PI_MCP23017
         else:
@@ -69,86 +104,255 @@ class PiRelayApp(AsyncioProp):
         self._wiring_date_p = PropData('wiring-date', str, NULL_DATE, logger=self._logger)
         self.addData(self._wiring_date_p)
 
+        # relay states published after the other data, one RelayData view per pin
+        self._relayBank = RelayBank(logger=self._logger)
+        self.addData(self._relayBank)
+
+        if WIRING_FAST_START:
+            # the MQTT connection is started later by withEventLoop(), retained wiring is then applied as a diff
+            self.applyLocalWiring()
+
         # no running loop is available at that time so we can't use asyncio.create_task()
         self.addPeriodicAction("read JSON rescue once", self.readJsonRescue, 3)
 
     # __________________________________________________________________
-    def _commandFromAction(self, action):
+    def _gpioLevel(self, gpio):
 
-        if action == '1':
-            return GPIO.HIGH
-        elif action == '0':
-            return GPIO.LOW
-        elif action in COMMANDS_SYNONYMS_HIGH:
-            return GPIO.HIGH
-        elif action in COMMANDS_SYNONYMS_LOW:
-            return GPIO.LOW
+        # RPi.GPIO.HIGH and RPi.GPIO.LOW are 1 and 0 like GPIO_HIGH and GPIO_LOW
+        if gpio == GPIO_HIGH:
+            return GPIO_HIGH
+        return GPIO_LOW
 
-        return None
+    # __________________________________________________________________
+    def _addPropPin(self, p, level=None):
+
+        if level is None:
+            level = self._gpioLevel(p['initial'])
+        self._propPins[p['pin']] = PropPin(p['pin'], p['variable'], p['initial'], p['alias'])
+        self._logger.info("Pin added from wiring : {}".format(p))
+        prop_data = self._relayBank.add(p['variable'], level, alias=p['alias'])
+        try:
+            output = self._pinOutput(p['pin'])
+            self._pinPropData[output] = prop_data
+            self._indexPropPin(output, p['variable'])
+        except Exception as e:
+            self._logger.error("Failed to parse '{}' output".format(p['pin']))
+            self._logger.debug(e)
 
     # __________________________________________________________________
-    def _gpioLevel(self, gpio):
+    def _createOutputBackends(self):
 
-        if gpio == GPIO_HIGH:
-            return GPIO.HIGH
-        return GPIO.LOW
+        self._gpioBackend = None
+        self._mcp23017Backend = None
+        simulator = None
+
+        if OUTPUT_SIMULATOR:
+            simulator = SimulatorBackend()
+            self._gpioBackend = simulator
+            if self._mcp23017:
+                self._mcp23017Backend = simulator
+        else:
+            if GPIO is not None:
+                self._gpioBackend = GpioBackend(GPIO)
+            elif _gpioImportError is not None:
+                self._logger.error("RPi.GPIO import failed, GPIO outputs are simulated")
+                self._logger.debug(_gpioImportError)
+            else:
+                self._logger.warning("RPi.GPIO not available on this board, GPIO outputs are simulated")
+
+            if self._mcp23017:
+                if smbus is not None:
+                    try:
+                        self._mcp23017Backend = Mcp23017Backend(smbus.SMBus(1), self._mcp23017Addresses)
+                    except OSError as e:
+                        self._logger.error("I2C bus 1 not available, MCP23017 outputs are simulated")
+                        self._logger.debug(e)
+                else:
+                    self._logger.error("smbus import failed, MCP23017 outputs are simulated")
+                    self._logger.debug(_smbusImportError)
+
+            if self._gpioBackend is None:
+                simulator = SimulatorBackend()
+                self._gpioBackend = simulator
+            if self._mcp23017 and self._mcp23017Backend is None:
+                self._mcp23017Backend = simulator if simulator is not None else SimulatorBackend()
+
+        self._logger.info("Output backend : {}".format(self._gpioBackend.name))
+        if self._mcp23017:
+            self._logger.info("MCP23017 output backend : {}".format(self._mcp23017Backend.name))
 
     # __________________________________________________________________
-    def _parseCommandMessage(self, message):
+    def _indexPropPin(self, output, variable):
 
-        predicate, action = message.split(':')
-        pins = []
-        command = self._commandFromAction(action)
+        self._variableOutputs.setdefault(variable, []).append(output)
 
-        if command is None:
-            return pins, command
-
-        if predicate.endswith('/*'):
-            group = predicate[:-1]
-            for pin in self._propPins:
-                if self._propPins[pin].getVariable().startswith(group):
-                    if pin.startswith('MCP23017'):
-                        self._logger.info("Pin ignored for '{}' command : {}".format(message, pin))
-                    else:
-                        try:
-                            output = int(pin[4:])
-                            pins.append(output)
-                        except Exception as e:
-                            self._logger.error("Failed to parse '{}' output in : {}".format(pin, message ))
-                            self._logger.debug(e)
+        # 'a/b/c' is commanded by 'a/*' and 'a/b/*'
+        slash = variable.find('/')
+        while slash >= 0:
+            self._groupOutputs.setdefault(variable[:slash + 1], []).append(output)
+            slash = variable.find('/', slash + 1)
+
+    # __________________________________________________________________
+    def _reindexPropPins(self):
+
+        self._variableOutputs = {}
+        self._groupOutputs = {}
+        for pin, prop_pin in self._propPins.items():
+            try:
+                self._indexPropPin(self._pinOutput(pin), prop_pin.getVariable())
+            except Exception as e:
+                self._logger.error("Failed to parse '{}' output".format(pin))
+                self._logger.debug(e)
+
+    # __________________________________________________________________
+    def _removePropPin(self, pin, cleanup=True):
+
+        # returns the current level of the pin
+        level = None
+        try:
+            output = self._pinOutput(pin)
+            if cleanup:
+                if isinstance(output, tuple):
+                    self._mcp23017Backend.setupInput([output])
+                else:
+                    self._gpioBackend.setupInput([output])
+                self._logger.info("Cleanup {} (set as input)".format(pin))
+            prop_data = self._pinPropData.pop(output, None)
+            if prop_data is not None:
+                level = prop_data.value()
+                self._relayBank.remove(prop_data)
+        except Exception as e:
+            self._logger.error("GPIO cleanup failed for pin {}".format(pin))
+            self._logger.debug(e)
+        del self._propPins[pin]
+        self._logger.info("Pin removed from wiring : {}".format(pin))
+        return level
+
+    # __________________________________________________________________
+    def _samePropPin(self, prop_pin, p):
+
+        return (prop_pin.getVariable() == p['variable'] and prop_pin.getInitial() == p['initial']
+                and tuple(prop_pin.getAlias()) == tuple(p['alias']))
+
+    # __________________________________________________________________
+    def _setupPinOut(self, p):
+
+        if p['pin'].startswith('MCP23017'):
+            if not self._mcp23017:
+                self._logger.info("Pin ignored from wiring : {}".format(p))
+                return False
+            return self.setMcp23017PinOut(p['pin'], p['initial'])
+        elif self._mcp23017 and (p['pin'] == 'GPIO2' or p['pin'] == 'GPIO3'):
+            # I2C SDA and SCL
+            self._logger.info("Pin ignored from wiring : {}".format(p))
+            return False
+        return self.setGpioPinOut(p['pin'], p['initial'])
+
+    # __________________________________________________________________
+    def _pinOutput(self, pin):
+
+        # GPIO outputs are BCM numbers, MCP23017 outputs are (address, port, bit)
+        if pin.startswith('MCP23017'):
+            return mcp23017Pin(pin, self._mcp23017Addresses[0])
+        return int(pin[4:])
+
+    # __________________________________________________________________
+    def applyLocalWiring(self):
+
+        if not self._wiringStore.exists():
+            return
+        try:
+            # parsed only if the file changed since last load
+            json_list = self._wiringStore.load()
+            self.processWiringJson(json_list)
+        except json.JSONDecodeError as jex:
+            self._logger.error("JSONDecodeError '{}' at {} in: {}".format(jex.msg, jex.pos, jex.doc))
+        except Exception as e:
+            self._logger.error("Failed to load JSON file '{0}'".format(WIRING_JSON_FILE))
+            self._logger.debug(e)
+        if self._wiring_p.value() == 'ERROR':
+            self._wiring_p.update('OFFLINE ERROR')
         else:
-            for pin in self._propPins:
-                print(pin, self._propPins[pin])
-                if self._propPins[pin].getVariable() == predicate:
-                    if pin.startswith('MCP23017'):
-                        self._logger.info("Pin ignored for '{}' command : {}".format(message, pin))
-                    else:
-                        try:
-                            output = int(pin[4:])
-                            pins.append(output)
-                        except Exception as e:
-                            self._logger.error("Failed to parse '{}' output in : {}".format(pin,message ))
-                            self._logger.debug(e)
-
-        return pins, command
+            self._wiring_p.update('OFFLINE')
+        if self._wiringStore.date():
+            self._wiring_date_p.update(self._wiringStore.date())
+        StartupProfile.mark('first wiring applied')
 
     # __________________________________________________________________
     def cleanupGpioPins(self):
 
+        expander_pins = {}
         for pin in self._propPins:
             try:
-                output = int(pin[4:])
-                GPIO.setup(output, GPIO.IN)
-                self._logger.info("Cleanup GPIO {} (set as input)".format(output))
+                output = self._pinOutput(pin)
+                if isinstance(output, tuple):
+                    expander_pins.setdefault(output[0], []).append(output[1:])
+                else:
+                    self._gpioBackend.setupInput([output])
+                    self._logger.info("Cleanup GPIO {} (set as input)".format(output))
             except Exception as e:
                 self._logger.error("GPIO cleanup failed for pin {}".format(pin))
                 self._logger.debug(e)
 
-        for pin in list(self._pinPropData.keys()):
-            self.removeData(self._pinPropData[pin])
-            del self._pinPropData[pin]
+        for address, pins in expander_pins.items():
+            try:
+                self._mcp23017Backend.setupInput([(address, port, bit) for port, bit in pins])
+                self._logger.info("Cleanup MCP23017 {:#04x} {} (set as input)".format(address, pins))
+            except Exception as e:
+                self._logger.error("MCP23017 cleanup failed at {:#04x}".format(address))
+                self._logger.debug(e)
+
+        self._relayBank.clear()
         self._pinPropData = {}
         self._propPins = {}
+        self._variableOutputs = {}
+        self._groupOutputs = {}
+        self._wiringOutputs = []
+        self._wiringTag = wiringTag([])
+
+    # __________________________________________________________________
+    def getData(self, name):
+        # relays are published by the bank, found by variable
+        data = super().getData(name)
+        if data is None:
+            data = self._relayBank.relay(name)
+        return data
+
+    # __________________________________________________________________
+    def onBinaryMessage(self, payload):
+
+        self._binaryPeer = True
+        if payload == bytes((FRAME_DATA_REQUEST,)):
+            self.sendAllData()
+            return
+
+        command = decodeCommand(payload)
+        if command is None:
+            self._logger.warning("Binary command unknown in : %s", payload.hex())
+            return
+
+        if command.tag != self._wiringTag:
+            # indexes of a wiring edited in the control and not uploaded, or of the previous wiring
+            self._logger.warning("Binary command ignored for another wiring : %s", payload.hex())
+            self.sendOmit(payload.hex())
+            self.sendBinaryData()
+            return
+
+        outputs = []
+        for i in command.indexes:
+            if i < len(self._wiringOutputs) and self._wiringOutputs[i] is not None:
+                outputs.append(self._wiringOutputs[i])
+            else:
+                self._logger.warning("No output found for binary pin index %s", i)
+
+        if outputs and self.setOutputs(outputs, command.level):
+            for output in outputs:
+                self._pinPropData[output].update(command.level)
+        # the binary DATA frame is the acknowledgement, sent along with DATA changes
+        if self._dirtyData:
+            self.sendDataChanges()
+        else:
+            self.sendBinaryData()
 
     # __________________________________________________________________
     def onConnect(self, client, userdata, flags, rc):
@@ -171,103 +375,141 @@ class PiRelayApp(AsyncioProp):
                 self.sendAllData()
                 self.sendDone(message)
             else:
-                outputs, command = self._parseCommandMessage(message)
-                if command is None:
-                    self._logger.warning("Command unknown in : {}".format(message))
-                    self.sendOmit(message)
-                elif outputs:
-                    for gpio in outputs:
-                        GPIO.output(gpio, command)
-                        self._logger.info("GPIO {} set to {}".format(gpio, command))
-                        if gpio in self._pinPropData:
-                            self._pinPropData[gpio].update(command)
-                        else:
-                            self._logger.warning("Prop data not found for '{}' output".format(gpio))
-                    self.sendDataChanges()
-                    self.sendDone(message)
-                else:
-                    self._logger.warning("No output found for : {}".format(message))
-                    self.sendOmit(message)
+                self._logger.warning("Command unknown in : {}".format(message))
+                self.sendOmit(message)
+
+    # __________________________________________________________________
+    def onCommand(self, command):
+
+        if command.level is None:
+            self._logger.warning("Command unknown in : %s", command.message)
+            self.sendOmit(command.message)
+            return
+
+        if command.group:
+            outputs = self._groupOutputs.get(command.predicate)
+        else:
+            outputs = self._variableOutputs.get(command.predicate)
+
+        if outputs:
+            if self.setOutputs(outputs, command.level):
+                for output in outputs:
+                    self._pinPropData[output].update(command.level)
+            self.sendDataChanges()
+            self.sendDone(command.message)
+        else:
+            self._logger.warning("No output found for : %s", command.message)
+            self.sendOmit(command.message)
+
+    # __________________________________________________________________
+    def parseCommand(self, payload):
+        return parseRelayCommand(payload)
 
     # __________________________________________________________________
     def processWiringJson(self, json_list):
 
+        # only pins added, removed or changed since the current wiring are reconfigured,
+        # returns True if any was, or if the pins were reordered
+        changed = False
+        wiring = {}
         for p in json_list:
             try:
-                if self._mcp23017:
-                    if p['pin'] == 'GPIO2' or p['pin'] == 'GPIO3':
-                        self._logger.info("Pin ignored from wiring : {}".format(p))
-                    elif p['pin'].startswith('MCP23017'):
-                        if self.setMcp23017PinOut(p['pin'], p['initial']):
-                            self._propPins[p['pin']] = PropPin(p['pin'], p['variable'], p['initial'], p['alias'])
-                            self._logger.info("Pin added from wiring : {}".format(p))
-                            prop_data = PropData(p['variable'], bool,
-                                                 self._gpioLevel(p['initial']),
-                                                 alias=p['alias'],
-                                                 logger=self._logger)
-                            self.addData(prop_data)
-                            try:
-                                output = int(p['pin'][4:])
-                                self._pinPropData[output] = prop_data
-                            except Exception as e:
-                                self._logger.error("Failed to parse '{}' output".format(p['pin']))
-                                self._logger.debug(e)
-                    else:
-                        if self.setGpioPinOut(p['pin'], p['initial']):
-                            self._propPins[p['pin']] = PropPin(p['pin'], p['variable'], p['initial'], p['alias'])
-                            self._logger.info("Pin added from wiring : {}".format(p))
-                            prop_data = PropData(p['variable'], bool,
-                                                 self._gpioLevel(p['initial']),
-                                                 alias=p['alias'],
-                                                 logger=self._logger)
-                            self.addData(prop_data)
-                            try:
-                                output = int(p['pin'][4:])
-                                self._pinPropData[output] = prop_data
-                            except Exception as e:
-                                self._logger.error("Failed to parse '{}' output".format(p['pin']))
-                                self._logger.debug(e)
-                else:
-                    if p['pin'].startswith('MCP23017'):
-                        self._logger.info("Pin ignored from wiring : {}".format(p))
-                    else:
-                        if self.setGpioPinOut(p['pin'], p['initial']):
-                            self._propPins[p['pin']] = PropPin(p['pin'], p['variable'], p['initial'], p['alias'])
-                            self._logger.info("Pin added from wiring : {}".format(p))
-                            prop_data = PropData(p['variable'], bool,
-                                                 self._gpioLevel(p['initial']),
-                                                 alias=p['alias'],
-                                                 logger=self._logger)
-                            self.addData(prop_data)
-                            try:
-                                output = int(p['pin'][4:])
-                                self._pinPropData[output] = prop_data
-                            except Exception as e:
-                                self._logger.error("Failed to parse '{}' output".format(p['pin']))
-                                self._logger.debug(e)
+                wiring[p['pin']] = p
+            except Exception as e:
+                self._wiring_p.update('ERROR')
+                self._logger.warning("Failed add pin from wiring : {}".format(p))
+                self._logger.warning(e)
+
+        levels = {}
+        for pin in list(self._propPins):
+            p = wiring.get(pin)
+            try:
+                if p is None:
+                    changed = True
+                    self._removePropPin(pin)
+                elif not self._samePropPin(self._propPins[pin], p):
+                    changed = True
+                    same_initial = self._propPins[pin].getInitial() == p['initial']
+                    level = self._removePropPin(pin, cleanup=False)
+                    if same_initial:
+                        levels[pin] = level
+            except Exception as e:
+                self._wiring_p.update('ERROR')
+                self._logger.warning("Failed to update pin from wiring : {}".format(p))
+                self._logger.warning(e)
+        self._reindexPropPins()
+
+        for p in json_list:
+            try:
+                if p['pin'] in self._propPins:
+                    continue
+                changed = True
+                if p['pin'] in levels:
+                    # output left as it is
+                    self._addPropPin(p, levels[p['pin']])
+                elif self._setupPinOut(p):
+                    self._addPropPin(p)
             except Exception as e:
                 self._wiring_p.update('ERROR')
                 self._logger.warning("Failed add pin from wiring : {}".format(p))
                 self._logger.warning(e)
 
+        # binary pin indexes are positions in the wiring JSON list
+        wiring_outputs = self._wiringOutputs
+        self._wiringOutputs = []
+        for p in json_list:
+            output = None
+            try:
+                if p['pin'] in self._propPins:
+                    output = self._pinOutput(p['pin'])
+                    if output not in self._pinPropData:
+                        output = None
+            except Exception:
+                pass
+            self._wiringOutputs.append(output)
+        self._wiringTag = wiringTag(p.get('variable') if isinstance(p, dict) else None for p in json_list)
+
+        # full DATA follows the wiring order, whatever relays were removed and added
+        relays = {}
+        for output in self._wiringOutputs:
+            if output is not None:
+                relays[self._pinPropData[output]] = None
+        self._relayBank.reorder(list(relays))
+
+        return changed or self._wiringOutputs != wiring_outputs
+
     # __________________________________________________________________
     def processWiringMessage(self, wiring):
 
-        try:
-            self._wiring_p.update('NONE')
-            self._wiring_date_p.update(NULL_DATE)
+        same_wiring = WiringStore.digestOf(wiring) == self._wiringStore.digest()
+        if same_wiring and self._wiring_p.value() in ['OK', 'OFFLINE']:
+            self._logger.info("Wiring unchanged")
+            self._wiring_p.update('OK')
             self.sendDataChanges()
-            self.cleanupGpioPins()
+            return
+
+        try:
             json_list = json.loads(wiring)
-            self.processWiringJson(json_list)
-            with open(WIRING_JSON_FILE, 'w', encoding='utf-8') as fp:
-                fp.write(wiring)
+            self._wiring_p.update('NONE')
+            changed = self.processWiringJson(json_list)
+            StartupProfile.mark('first wiring applied')
+            try:
+                # written only if changed
+                self._wiringStore.save(wiring, json_list)
+            except Exception as e:
+                self._logger.error("Failed to save JSON file '{0}'".format(WIRING_JSON_FILE))
+                self._logger.debug(e)
+            if self._wiringStore.date():
+                self._wiring_date_p.update(self._wiringStore.date())
             if self._wiring_p.value() == 'ERROR':
                 self._wiring_p.update('ONLINE ERROR')
             else:
                 self._wiring_p.update('OK')
-            self._wiring_date_p.update("%s" % time.ctime(os.path.getmtime(WIRING_JSON_FILE)))
-            self.sendAllData()
+            if changed:
+                # variables of removed pins are dropped from the control state only by a full DATA
+                self.sendAllData()
+            else:
+                self.sendDataChanges()
         except json.JSONDecodeError as jex:
             self._logger.error("JSONDecodeError '{}' at {} in : {}".format(jex.msg, jex.pos, jex.doc))
         except Exception as e:
@@ -283,37 +525,49 @@ class PiRelayApp(AsyncioProp):
             self._wiring_date_p.update(NULL_DATE)
             self.sendDataChanges()
             self.cleanupGpioPins()
-            if os.path.isfile(WIRING_JSON_FILE):
-                try:
-                    with open(WIRING_JSON_FILE, 'r', encoding='utf-8') as fp:
-                        json_list = json.load(fp)
-                    self.processWiringJson(json_list)
-                except json.JSONDecodeError as jex:
-                    self._logger.error("JSONDecodeError '{}' at {} in: {}".format(jex.msg, jex.pos, jex.doc))
-                except Exception as e:
-                    self._logger.error("Failed to load JSON file '{0}'".format(self._localFile))
-                    self._logger.debug(e)
-                if self._wiring_p.value() == 'ERROR':
-                    self._wiring_p.update('OFFLINE ERROR')
-                else:
-                    self._wiring_p.update('OFFLINE')
-                self._wiring_date_p.update("%s" % time.ctime(os.path.getmtime(WIRING_JSON_FILE)))
+            self.applyLocalWiring()
             self.sendAllData()
 
     # __________________________________________________________________
     def sendAllData(self):
+        if self._binaryPeer:
+            self.sendBinaryData()
         super().sendAllData()
 
+    # __________________________________________________________________
+    def sendBinaryData(self):
+        levels = []
+        for output in self._wiringOutputs:
+            if output is None:
+                levels.append(GPIO_LOW)
+            else:
+                levels.append(self._pinPropData[output].value())
+        self._publishBinaryMessage(encodeData(levels, self._wiringTag))
+
     # __________________________________________________________________
     def sendDataChanges(self):
+        if self._binaryPeer and self._dirtyData:
+            self.sendBinaryData()
         super().sendDataChanges()
 
+    # __________________________________________________________________
+    def setOutputs(self, outputs, level):
+
+        gpios = [output for output in outputs if not isinstance(output, tuple)]
+        expander_outputs = [output for output in outputs if isinstance(output, tuple)]
+        done = True
+        if gpios:
+            done = self.setGpioOutputs(gpios, level)
+        if expander_outputs:
+            done = self.setMcp23017Outputs(expander_outputs, level) and done
+        return done
+
     # __________________________________________________________________
     def setGpioPinOut(self, pin, initial):
 
         try:
             output = int(pin[4:])
-            GPIO.setup(output, GPIO.OUT, initial=self._gpioLevel(initial))
+            self._gpioBackend.setupOutput([output], self._gpioLevel(initial))
             self._logger.info("GPIO {} set as output (initial={})".format(output, self._gpioLevel(initial)))
         except Exception as e:
             self._logger.error("GPIO setup failed for pin {}".format(pin))
@@ -321,11 +575,37 @@ class PiRelayApp(AsyncioProp):
             return False
         return True
 
+    # __________________________________________________________________
+    def setGpioOutputs(self, outputs, level):
+
+        try:
+            self._gpioBackend.output(outputs, level)
+            self._logger.info("GPIO %s set to %s", outputs, level)
+        except Exception as e:
+            self._logger.error("GPIO output failed for {}".format(outputs))
+            self._logger.debug(e)
+            return False
+        return True
+
+    # __________________________________________________________________
+    def setMcp23017Outputs(self, outputs, level):
+
+        try:
+            self._mcp23017Backend.output(outputs, level)
+            self._logger.info("MCP23017 %s set to %s", outputs, level)
+        except Exception as e:
+            self._logger.error("MCP23017 output failed for {}".format(outputs))
+            self._logger.debug(e)
+            return False
+        return True
+
     # __________________________________________________________________
     def setMcp23017PinOut(self, pin, initial):
 
         try:
-            self._logger.warning("MCP23017 pin not setup TBD...")
+            output = mcp23017Pin(pin, self._mcp23017Addresses[0])
+            self._mcp23017Backend.setupOutput([output], self._gpioLevel(initial))
+            self._logger.info("MCP23017 {} set as output (initial={})".format(pin, self._gpioLevel(initial)))
         except Exception as e:
             self._logger.error("MCP23017 setup failed for pin {}".format(pin))
             self._logger.debug(e)
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+RelayBank.py
+MIT License (c) Faure Systems <dev at faure dot systems>
+
+Relay states of the prop as integer bitsets:
+- levels and references bitsets, changes are levels ^ references
+- 'name=value' fragments built once per relay for both levels
+- the bank is a single publishable, changes are serialized walking the set bits
+- reorder() compacts the bank so bit order is the wiring order, the DATA layout
+  is then kept when a wiring diff removes and adds relays
+- the bank has no name of its own, relay(name) finds the RelayData of a relay
+
+RelayData is a thin PropData-like view of one relay of the bank.
+"""
+
+import heapq
+
+
+class RelayData:
+    __slots__ = ('_bank', '_index')
+
+    # __________________________________________________________________
+    def __init__(self, bank, index):
+        self._bank = bank
+        self._index = index
+
+    # __________________________________________________________________
+    def __str__(self):
+        return self._bank.fragment(self._index)
+
+    # __________________________________________________________________
+    def change(self):
+        if self.pending():
+            return self.__str__()
+        return None
+
+    # __________________________________________________________________
+    def name(self):
+        return self._bank.relayName(self._index)
+
+    # __________________________________________________________________
+    def pending(self):
+        return bool(self._bank.changes() >> self._index & 1)
+
+    # __________________________________________________________________
+    def update(self, value):
+        self._bank.setLevel(self._index, value)
+
+    # __________________________________________________________________
+    def value(self):
+        return self._bank.level(self._index)
+
+
+class RelayBank:
+
+    # __________________________________________________________________
+    def __init__(self, logger=None):
+        super().__init__()
+
+        self._logger = logger
+        self._dirty = None
+        self._levels = 0
+        self._references = 0
+        self._active = 0
+        self._names = []
+        self._fragments = []  # ('name=low alias', 'name=high alias') per relay
+        self._relays = []  # RelayData per relay
+        self._indexes = {}  # name -> relay index
+        self._free = []  # heap of free relay indexes
+
+    # __________________________________________________________________
+    def __str__(self):
+        # full serialization, all relays are published
+        self._references = self._levels
+        return " ".join(self._fragmentsOf(self._active))
+
+    # __________________________________________________________________
+    def _fragmentsOf(self, bits):
+        fragments = []
+        levels = self._levels
+        while bits:
+            low = bits & -bits
+            i = low.bit_length() - 1
+            fragments.append(self._fragments[i][levels >> i & 1])
+            bits ^= low
+        return fragments
+
+    # __________________________________________________________________
+    def _markDirty(self):
+        if self._dirty is not None:
+            self._dirty[self] = None
+
+    # __________________________________________________________________
+    def add(self, name, initial, alias=("1", "0")):
+        if self._free:
+            i = heapq.heappop(self._free)
+            self._names[i] = name
+            self._fragments[i] = ("{0}={1}".format(name, alias[1]), "{0}={1}".format(name, alias[0]))
+            self._relays[i] = RelayData(self, i)
+        else:
+            i = len(self._names)
+            self._names.append(name)
+            self._fragments.append(("{0}={1}".format(name, alias[1]), "{0}={1}".format(name, alias[0])))
+            self._relays.append(RelayData(self, i))
+        self._indexes[name] = i
+        bit = 1 << i
+        self._active |= bit
+        if initial:
+            self._levels |= bit
+            self._references &= ~bit  # force an initial change
+        else:
+            self._levels &= ~bit
+            self._references |= bit
+        self._markDirty()
+        if self._logger:
+            self._logger.info(
+                "{0} '{1}' ({2}/{3}) {4}={5}".format("New relay Publishable", name, alias[0], alias[1],
+                                                     "with initial", initial))
+        return self._relays[i]
+
+    # __________________________________________________________________
+    def change(self):
+        changes = self.changes()
+        if not changes:
+            return None
+        self._references = self._levels
+        return " ".join(self._fragmentsOf(changes))
+
+    # __________________________________________________________________
+    def changes(self):
+        # bitset of the relays changed since last publish
+        return (self._levels ^ self._references) & self._active
+
+    # __________________________________________________________________
+    def clear(self):
+        self._levels = 0
+        self._references = 0
+        self._active = 0
+        self._names = []
+        self._fragments = []
+        self._relays = []
+        self._indexes = {}
+        self._free = []
+
+    # __________________________________________________________________
+    def fragment(self, index):
+        bit = 1 << index
+        self._references = (self._references & ~bit) | (self._levels & bit)
+        return self._fragments[index][self._levels >> index & 1]
+
+    # __________________________________________________________________
+    def level(self, index):
+        return self._levels >> index & 1
+
+    # __________________________________________________________________
+    def name(self):
+        # the bank is published as one data without name, kept out of the app name index
+        return None
+
+    # __________________________________________________________________
+    def pending(self):
+        return bool(self.changes())
+
+    # __________________________________________________________________
+    def relay(self, name):
+        # RelayData of the relay, None if unknown
+        i = self._indexes.get(name)
+        return None if i is None else self._relays[i]
+
+    # __________________________________________________________________
+    def relayName(self, index):
+        return self._names[index]
+
+    # __________________________________________________________________
+    def remove(self, relay):
+        i = relay._index
+        bit = 1 << i
+        self._active &= ~bit
+        self._levels &= ~bit
+        self._references &= ~bit
+        if self._indexes.get(self._names[i]) == i:
+            del self._indexes[self._names[i]]
+        self._names[i] = None
+        self._fragments[i] = None
+        self._relays[i] = None
+        heapq.heappush(self._free, i)
+
+    # __________________________________________________________________
+    def reorder(self, relays):
+        # compact the bank, relay indexes follow the given order (wiring order), relays not given are removed
+        levels = 0
+        references = 0
+        names = []
+        fragments = []
+        for i, relay in enumerate(relays):
+            j = relay._index
+            levels |= (self._levels >> j & 1) << i
+            references |= (self._references >> j & 1) << i
+            names.append(self._names[j])
+            fragments.append(self._fragments[j])
+        for relay in self._relays:
+            if relay is not None:
+                relay._index = None
+        for i, relay in enumerate(relays):
+            relay._index = i
+        self._levels = levels
+        self._references = references
+        self._active = (1 << len(relays)) - 1
+        self._names = names
+        self._fragments = fragments
+        self._relays = list(relays)
+        self._indexes = {name: i for i, name in enumerate(names)}
+        self._free = []
+
+    # __________________________________________________________________
+    def setLevel(self, index, level):
+        bit = 1 << index
+        if level:
+            self._levels |= bit
+        else:
+            self._levels &= ~bit
+        self._markDirty()
+
+    # __________________________________________________________________
+    def track(self, dirty):
+        # dirty is the dict-based set of the app where setLevel() marks the bank
+        self._dirty = dirty
+        if dirty is not None:
+            dirty[self] = None
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+RelayBinary.py
+MIT License (c) Faure Systems <dev at faure dot systems>
+
+Compact binary framing of the relay protocol, exchanged on the inbox and
+outbox topics suffixed with MQTT_BINARY_SUFFIX (the text protocol is unchanged):
+    command:      0x01 level tag bitmap   -> set the pins of the bitmap to level
+    data:         0x02 tag count bitmap   -> relay states, count is little-endian uint16
+    data request: 0x03                    -> like app:data
+
+Pins are numbered by their position in the wiring JSON list, bitmaps are
+little-endian (pin 0 is bit 0 of the first byte). The tag (little-endian uint16,
+see wiringTag()) identifies the wiring the indexes refer to: a command for another
+wiring is rejected by the prop, data for another wiring is not decoded by the control.
+"""
+
+from collections import namedtuple
+import zlib
+
+FRAME_COMMAND = 0x01
+FRAME_DATA = 0x02
+FRAME_DATA_REQUEST = 0x03
+
+BinaryCommand = namedtuple('BinaryCommand', ['level', 'tag', 'indexes'])
+BinaryData = namedtuple('BinaryData', ['tag', 'levels'])
+
+
+# __________________________________________________________________
+def _bitmap(bits):
+    mask = 0
+    for i, bit in enumerate(bits):
+        if bit:
+            mask |= 1 << i
+    return mask.to_bytes((len(bits) + 7) // 8, 'little')
+
+
+# __________________________________________________________________
+def decodeCommand(payload):
+    """Return a BinaryCommand, or None if payload is not a command frame."""
+    if len(payload) < 5 or payload[0] != FRAME_COMMAND or payload[1] > 1:
+        return None
+    tag = int.from_bytes(payload[2:4], 'little')
+    mask = int.from_bytes(payload[4:], 'little')
+    indexes = []
+    i = 0
+    while mask:
+        if mask & 1:
+            indexes.append(i)
+        mask >>= 1
+        i += 1
+    return BinaryCommand(payload[1], tag, indexes)
+
+
+# __________________________________________________________________
+def decodeData(payload):
+    """Return a BinaryData, or None if payload is not a data frame."""
+    if len(payload) < 5 or payload[0] != FRAME_DATA:
+        return None
+    tag = int.from_bytes(payload[1:3], 'little')
+    count = int.from_bytes(payload[3:5], 'little')
+    if len(payload) < 5 + (count + 7) // 8:
+        return None
+    mask = int.from_bytes(payload[5:], 'little')
+    return BinaryData(tag, [(mask >> i) & 1 for i in range(count)])
+
+
+# __________________________________________________________________
+def encodeCommand(indexes, level, tag):
+    bits = [False] * (max(indexes) + 1 if indexes else 1)
+    for i in indexes:
+        bits[i] = True
+    return bytes((FRAME_COMMAND, 1 if level else 0)) + tag.to_bytes(2, 'little') + _bitmap(bits)
+
+
+# __________________________________________________________________
+def encodeData(levels, tag):
+    return bytes((FRAME_DATA,)) + tag.to_bytes(2, 'little') + len(levels).to_bytes(2, 'little') + _bitmap(levels)
+
+
+# __________________________________________________________________
+def encodeDataRequest():
+    return bytes((FRAME_DATA_REQUEST,))
+
+
+# __________________________________________________________________
+def wiringTag(variables):
+    """Return the tag of a wiring given its variables in wiring order, None for a null pin."""
+    text = "\n".join('' if v is None else v for v in variables)
+    return zlib.crc32(text.encode('utf-8')) & 0xFFFF
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+RelayCommand.py
+MIT License (c) Faure Systems <dev at faure dot systems>
+
+Parse relay commands straight from the MQTT payload bytes:
+    variable:action  -> command the pins wired to variable
+    group/*:action   -> command the pins of variables starting with 'group/'
+
+Actions are looked up in the frozen ACTION_LEVELS dict, the action token is a
+memoryview slice of the payload so it is never copied.
+"""
+
+from collections import namedtuple
+from types import MappingProxyType
+
+from constants import *
+
+ACTION_LEVELS = MappingProxyType(dict(
+    [(b'1', GPIO_HIGH), (b'0', GPIO_LOW)]
+    + [(action.encode('utf-8'), GPIO_HIGH) for action in COMMANDS_SYNONYMS_HIGH]
+    + [(action.encode('utf-8'), GPIO_LOW) for action in COMMANDS_SYNONYMS_LOW]))
+
+# predicate is the variable or the group prefix ending with '/', level is None for an unknown action
+RelayCommand = namedtuple('RelayCommand', ['predicate', 'group', 'level', 'message'])
+
+
+# __________________________________________________________________
+def parseRelayCommand(payload):
+    """Return a RelayCommand, or None if payload is not a relay command (app:..., @PING, ...)."""
+    colon = payload.find(b':')
+    if colon <= 0 or payload.find(b':', colon + 1) >= 0:
+        return None
+    view = memoryview(payload)
+    try:
+        predicate = str(view[:colon], 'utf-8')
+        message = str(payload, 'utf-8')
+    except UnicodeDecodeError:
+        return None
+    if predicate == 'app':
+        return None
+    level = ACTION_LEVELS.get(view[colon + 1:])
+    if predicate.endswith('/*'):
+        return RelayCommand(predicate[:-1], True, level, message)
+    return RelayCommand(predicate, False, level, message)
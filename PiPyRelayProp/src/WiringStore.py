@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+WiringStore.py
+MIT License (c) Faure Systems <dev at faure dot systems>
+
+Local wiring JSON file of PiRelayApp kept in memory:
+- parsed wiring and content hash cached, the file is read again only if its stat changed
+- written only when the content changed, atomically (temp file, fsync, rename)
+- wiring date taken from the written file descriptor, no second stat
+"""
+
+import hashlib
+import json
+import os
+import time
+
+
+class WiringStore:
+
+    # __________________________________________________________________
+    def __init__(self, path, logger):
+        super().__init__()
+
+        self._path = path
+        self._logger = logger
+        self._digest = None
+        self._jsonList = None
+        self._mtime = None
+        self._stat = None  # (st_mtime_ns, st_size) of the cached content
+
+    # __________________________________________________________________
+    def _cache(self, wiring, json_list, st):
+        self._digest = self.digestOf(wiring)
+        self._jsonList = json_list
+        self._mtime = st.st_mtime
+        self._stat = (st.st_mtime_ns, st.st_size)
+
+    # __________________________________________________________________
+    def date(self):
+        # same as time.ctime(os.path.getmtime(path)) for the cached content
+        if self._mtime is None:
+            return None
+        return time.ctime(self._mtime)
+
+    # __________________________________________________________________
+    def digest(self):
+        if self._digest is None and os.path.isfile(self._path):
+            try:
+                self.load()
+            except Exception as e:
+                self._logger.warning("Failed to load JSON file '{0}'".format(self._path))
+                self._logger.debug(e)
+        return self._digest
+
+    # __________________________________________________________________
+    @staticmethod
+    def digestOf(wiring):
+        return hashlib.sha1(wiring.encode('utf-8')).hexdigest()
+
+    # __________________________________________________________________
+    def exists(self):
+        return self._jsonList is not None or os.path.isfile(self._path)
+
+    # __________________________________________________________________
+    def load(self):
+        # returns the parsed wiring, raises OSError or json.JSONDecodeError
+        st = os.stat(self._path)
+        if self._jsonList is not None and self._stat == (st.st_mtime_ns, st.st_size):
+            return self._jsonList
+        with open(self._path, 'r', encoding='utf-8') as fp:
+            wiring = fp.read()
+        json_list = json.loads(wiring)
+        self._cache(wiring, json_list, st)
+        return json_list
+
+    # __________________________________________________________________
+    def save(self, wiring, json_list):
+        # returns False if the file already has this content
+        if self.digestOf(wiring) == self.digest():
+            self._jsonList = json_list
+            return False
+
+        tmp = self._path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as fp:
+            fp.write(wiring)
+            fp.flush()
+            os.fsync(fp.fileno())
+            st = os.fstat(fp.fileno())
+        os.replace(tmp, self._path)
+
+        try:
+            # make the rename durable
+            fd = os.open(os.path.dirname(os.path.abspath(self._path)), os.O_RDONLY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+        except OSError:
+            pass
+
+        self._cache(wiring, json_list, st)
+        return True
@@ -11,9 +11,19 @@ APPLICATION = "PiPyRelayProp"
 PYPROPS_CORELIBPATH = './pyprops-core'
 
 PUBLISHALLDATA_PERIOD = 30.0
+PUBLISHALLDATA_JITTER = 2.0  # random delay in seconds added to each full DATA snapshot, spreads a fleet of props
+PUBLISHALLDATA_RANDOM_PHASE = True  # first periodic full DATA at a random time within the period
+PUBLISHALLDATA_RECENT = 15.0  # periodic full DATA skipped if one was sent within these seconds (app:data)
+PUBLISHALLDATA_MAX_BACKOFF = 8  # periodic full DATA sent up to every 8 periods while the broker is congested
+MQTT_INFLIGHT_CONGESTION = 20  # messages not acknowledged by the broker beyond which it is congested
+PERIODIC_STATS_PERIOD = 0  # seconds between periodic tasks run-time stats in the log, 0 to disable
+DATA_COALESCING_WINDOW = 0.010  # seconds to merge DATA changes in one message, 0 to disable
 
 USE_GPIO = True
 GPIO_CLEANUP = False  # if board is used exclusively as Relay Prop
+OUTPUT_SIMULATOR = False  # outputs simulated in memory, forced when RPi.GPIO is not available
+SIMULATOR_CAPACITY = 4096  # pin transitions kept by the simulator
+WIRING_FAST_START = True  # apply the local wiring before MQTT connection, instead of 3 seconds after start
 
 #__________________________________________________________________
 # Required by MqttApp
@@ -24,6 +34,9 @@ MQTT_DEFAULT_PORT = 1883
 MQTT_DEFAULT_QoS = 1
 
 MQTT_KEEPALIVE = 15 # 15 seconds is default MQTT_KEEPALIVE in Arduino PubSubClient.h
+MQTT_ASYNCIO_TRANSPORT = True  # Paho client driven by the asyncio event loop instead of its own thread
+MQTT_LOG_SAMPLING = 1  # log 1 of N message lines received, sent and published
+MQTT_BINARY_SUFFIX = '/bin'  # compact binary protocol on inbox/bin and outbox/bin, None to disable
 
 #__________________________________________________________________
 # Required by PiPyRelayProp
@@ -40,6 +53,7 @@ MQTT_KEEPALIVE = 15 # 15 seconds is default MQTT_KEEPALIVE in Arduino PubSubClie
 #010 0  0  0  0      0x20
 
 #MCP23017_ADDRESS = 0x27
+#MCP23017_ADDRESS = (0x27, 0x26)  # several expanders, pins of the others named like MCP23017_0x26_GPIOA0
 
 BOARD_PI = 'Pi'
 BOARD_PI_MCP23017 = 'Pi MCP23017'
@@ -5,7 +5,7 @@ main.py
 
 Main script for AsyncioProp.
 
-usage: python3 main.py [-h] [-s SERVER] [-p PORT] [-d] [-l LOGGER]
+usage: python3 main.py [-h] [-s SERVER] [-p PORT] [-d] [-l LOGGER] [--profile-startup]
 
 optional arguments:
  -h, --help   show this help message and exit
@@ -15,10 +15,15 @@ optional arguments:
  -d, --debug   set DEBUG log level
  -l LOGGER, --logger LOGGER
       use logging config file
+ --profile-startup  print startup phase timings
 
 To switch MQTT broker, kill the program and start again with new arguments.
 '''
 
+import time
+
+startup_time = time.perf_counter()
+
 import asyncio
 import os
 import platform
@@ -38,9 +43,15 @@ try:
 except NameError:
     pass
 
+import StartupProfile
+
+StartupProfile.begin(startup_time)
+
 from PiRelayApp import PiRelayApp
 from Singleton import Singleton, SingletonException
 
+StartupProfile.mark('imports')
+
 me = None
 try:
     me = Singleton()
@@ -63,6 +74,8 @@ mqtt_client = mqtt.Client(uuid.uuid4().urn, clean_session=True, userdata=None)
 
 app = PiRelayApp(sys.argv, mqtt_client, debugging_mqtt=False)
 
+StartupProfile.mark('app created')
+
 loop = asyncio.get_event_loop()
 app.withEventLoop(loop)
 
@@ -3,7 +3,9 @@
 '''
 mcp23017.py
 
-Constants for MCP23017 expander.
+Constants and driver for MCP23017 expander.
+
+Run 'python3 mcp23017.py' to check the I2C writes of a group command on FakeSMBus.
 '''
 
 MCP23017_IODIRA = 0x00
@@ -29,3 +31,136 @@ MCP23017_INTFB = 0x0F
 MCP23017_INTCAPB = 0x11
 MCP23017_GPIOB = 0x13
 MCP23017_OLATB = 0x15
+
+MCP23017_PORTS = 'AB'
+
+
+# __________________________________________________________________
+def mcp23017Pin(pin, address):
+    """Parse 'MCP23017_GPIOA3' or 'MCP23017_0x21_GPIOB7' into (address, port, bit)."""
+    fields = pin.split('_')
+    if len(fields) == 3:
+        address = int(fields[1], 16)
+    elif len(fields) != 2:
+        raise ValueError("Invalid MCP23017 pin '{}'".format(pin))
+    name = fields[-1]
+    if not name.startswith('GPIO') or len(name) != 6 or name[4] not in MCP23017_PORTS:
+        raise ValueError("Invalid MCP23017 pin '{}'".format(pin))
+    bit = int(name[5])
+    if not 0x20 <= address <= 0x27 or not 0 <= bit <= 7:
+        raise ValueError("Invalid MCP23017 pin '{}'".format(pin))
+    return address, MCP23017_PORTS.index(name[4]), bit
+
+
+class Mcp23017:
+    """MCP23017 expander driven from shadow copies of IODIR and OLAT registers.
+
+    Registers are never read back: each call computes the new port bytes from the
+    shadow registers and writes each changed port once (IOCON.BANK=0 addressing).
+    """
+
+    # __________________________________________________________________
+    def __init__(self, bus, address):
+        super().__init__()
+
+        self._bus = bus
+        self._address = address
+        self._iodir = [0xFF, 0xFF]  # power-on reset: all pins are inputs
+        self._olat = [0x00, 0x00]
+
+    # __________________________________________________________________
+    def _write(self, register, port, value):
+        self._bus.write_byte_data(self._address, register + port, value)
+
+    # __________________________________________________________________
+    def _masks(self, pins):
+        masks = [0, 0]
+        for port, bit in pins:
+            masks[port] |= 1 << bit
+        return masks
+
+    # __________________________________________________________________
+    def address(self):
+        return self._address
+
+    # __________________________________________________________________
+    def output(self, pins, level):
+        masks = self._masks(pins)
+        for port in (0, 1):
+            if masks[port]:
+                olat = self._olat[port] | masks[port] if level else self._olat[port] & ~masks[port]
+                if olat != self._olat[port]:
+                    self._write(MCP23017_OLATA, port, olat)
+                    self._olat[port] = olat
+
+    # __________________________________________________________________
+    def setupInput(self, pins):
+        masks = self._masks(pins)
+        for port in (0, 1):
+            iodir = self._iodir[port] | masks[port]
+            if iodir != self._iodir[port]:
+                self._write(MCP23017_IODIRA, port, iodir)
+                self._iodir[port] = iodir
+
+    # __________________________________________________________________
+    def setupOutput(self, pins, level):
+        # latch the initial level before the pins are driven
+        self.output(pins, level)
+        masks = self._masks(pins)
+        for port in (0, 1):
+            iodir = self._iodir[port] & ~masks[port]
+            if iodir != self._iodir[port]:
+                self._write(MCP23017_IODIRA, port, iodir)
+                self._iodir[port] = iodir
+
+    # __________________________________________________________________
+    def reset(self):
+        # align the chip with the shadow registers
+        for port in (0, 1):
+            self._write(MCP23017_OLATA, port, self._olat[port])
+            self._write(MCP23017_IODIRA, port, self._iodir[port])
+
+
+class FakeSMBus:
+    """SMBus stand-in recording I2C transactions, to run the expander without hardware."""
+
+    # __________________________________________________________________
+    def __init__(self, bus=1):
+        super().__init__()
+
+        self.bus = bus
+        self.registers = {}
+        self.transactions = []
+
+    # __________________________________________________________________
+    def read_byte_data(self, address, register):
+        self.transactions.append(('read', address, register))
+        return self.registers.get((address, register), 0)
+
+    # __________________________________________________________________
+    def write_byte_data(self, address, register, value):
+        self.transactions.append(('write', address, register, value))
+        self.registers[(address, register)] = value & 0xFF
+
+
+if __name__ == '__main__':
+    # I2C transactions of a group command: at most one write per port, never a read
+    bus = FakeSMBus()
+    expander = Mcp23017(bus, 0x20)
+    expander.reset()
+    group = [(port, bit) for port in (0, 1) for bit in range(8)]
+    expander.setupOutput(group, 0)
+
+    for level in (1, 0, 0):
+        del bus.transactions[:]
+        expander.output(group, level)
+        writes = [t for t in bus.transactions if t[0] == 'write']
+        assert len(writes) == len(bus.transactions), bus.transactions
+        assert len(writes) <= len(MCP23017_PORTS), bus.transactions
+        assert all(bus.registers[(0x20, MCP23017_OLATA + port)] == (0xFF if level else 0x00) for port in (0, 1))
+        print("group command {} : {} I2C write(s)".format(level, len(writes)))
+
+    del bus.transactions[:]
+    expander.output([(0, 3)], 1)
+    assert len(bus.transactions) == 1 and bus.transactions[0][2] == MCP23017_OLATA, bus.transactions
+    print("single pin command : 1 I2C write")
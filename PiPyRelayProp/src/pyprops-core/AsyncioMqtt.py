@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+AsyncioMqtt.py
+MIT License (c) Faure Systems <dev at faure dot systems>
+
+Drive the Paho MQTT client socket from an asyncio event loop instead of the
+loop_start() thread, so that MQTT callbacks run on the event loop thread:
+- socket reads and writes with add_reader()/add_writer()
+- keepalive and retries with loop_misc() every second
+- reconnection with exponential backoff (1 to 120 seconds like Paho), also when
+  the broker drops the connection right after accepting it, the delay is reset
+  by connected() once the broker has acknowledged the connection (CONNACK)
+- the blocking reconnect() (DNS lookup and TCP connect) runs in the default
+  executor, the socket callbacks it fires are handed over to the event loop thread
+"""
+
+import asyncio
+import paho.mqtt.client as mqtt
+
+
+class AsyncioMqtt:
+
+    # __________________________________________________________________
+    def __init__(self, loop, client, logger):
+        super().__init__()
+
+        self._loop = loop
+        self._client = client
+        self._logger = logger
+        self._miscTask = None
+        self._reconnectTask = None
+        self._stopped = False
+        self._delay = 1
+
+        self._client.on_socket_open = self._onSocketOpen
+        self._client.on_socket_close = self._onSocketClose
+        self._client.on_socket_register_write = self._onSocketRegisterWrite
+        self._client.on_socket_unregister_write = self._onSocketUnregisterWrite
+
+    # __________________________________________________________________
+    async def _connect(self, wait):
+        while not self._stopped:
+            if wait:
+                await asyncio.sleep(self._delay)
+                self._delay = min(self._delay * 2, 120)
+            wait = True
+            try:
+                # connect_async() has set host, port and keepalive
+                await self._loop.run_in_executor(None, self._client.reconnect)
+                return
+            except Exception as e:
+                self._logger.warning("MQTT connection failed, retry in {} seconds".format(self._delay))
+                self._logger.debug(e)
+
+    # __________________________________________________________________
+    async def _misc(self):
+        while self._client.loop_misc() == mqtt.MQTT_ERR_SUCCESS:
+            await asyncio.sleep(1)
+
+    # __________________________________________________________________
+    def _onLoop(self, callback, *args):
+        # socket callbacks also come from reconnect() on an executor thread
+        try:
+            running = asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            running = False
+        if running:
+            callback(*args)
+        else:
+            self._loop.call_soon_threadsafe(callback, *args)
+
+    # __________________________________________________________________
+    def _onSocketClose(self, client, userdata, sock):
+        self._onLoop(self._socketClosed, sock)
+
+    # __________________________________________________________________
+    def _onSocketOpen(self, client, userdata, sock):
+        self._onLoop(self._socketOpened, sock)
+
+    # __________________________________________________________________
+    def _onSocketRegisterWrite(self, client, userdata, sock):
+        self._onLoop(self._loop.add_writer, sock, self._client.loop_write)
+
+    # __________________________________________________________________
+    def _onSocketUnregisterWrite(self, client, userdata, sock):
+        self._onLoop(self._loop.remove_writer, sock)
+
+    # __________________________________________________________________
+    def _socketClosed(self, sock):
+        self._loop.remove_reader(sock)
+        self._loop.remove_writer(sock)
+        if self._miscTask:
+            self._miscTask.cancel()
+            self._miscTask = None
+        if not self._stopped:
+            self._logger.warning("MQTT connection closed, retry in {} seconds".format(self._delay))
+            self.start(wait=True)
+
+    # __________________________________________________________________
+    def _socketOpened(self, sock):
+        # the reconnect task is only returning from the executor, a close on this
+        # socket (read below) must start a new one
+        self._reconnectTask = None
+        self._loop.add_reader(sock, self._client.loop_read)
+        self._miscTask = self._loop.create_task(self._misc())
+
+    # __________________________________________________________________
+    def connected(self):
+        # called on a successful CONNACK
+        self._delay = 1
+
+    # __________________________________________________________________
+    def start(self, wait=False):
+        self._stopped = False
+        if self._reconnectTask is None or self._reconnectTask.done():
+            self._reconnectTask = self._loop.create_task(self._connect(wait))
+
+    # __________________________________________________________________
+    def stop(self):
+        self._stopped = True
+        if self._reconnectTask:
+            self._reconnectTask.cancel()
+        self._client.disconnect()
@@ -5,26 +5,74 @@ AsyncioProp.py
 MIT License (c) Faure Systems <dev at faure dot systems>
 
 Add asyncio periodic tasks handling to Props base class.
+
+With MQTT_ASYNCIO_TRANSPORT the Paho client is driven by the event loop
+(see AsyncioMqtt.py) so MQTT callbacks, onMessage() included, run on the loop
+thread like periodic tasks.
+
+Periodic actions given as plain callables are run by the PeriodicScheduler on the
+event loop, one per loop iteration so commands are handled between them. Coroutine
+functions are still started as independent tasks with the period as argument.
+The full DATA snapshot is a low priority action spread over the props fleet (see PropApp.py).
+
+DATA changes sent within DATA_COALESCING_WINDOW seconds are merged in one
+DATA message, DONE and OMIT sent meanwhile are published after it.
 """
 
 from constants import *
+
+try:
+    DATA_COALESCING_WINDOW
+except NameError:
+    DATA_COALESCING_WINDOW = 0
+try:
+    MQTT_ASYNCIO_TRANSPORT
+except NameError:
+    MQTT_ASYNCIO_TRANSPORT = False
+
+from AsyncioMqtt import AsyncioMqtt
 from PropApp import PropApp
 import asyncio
+import threading
 
 
 class AsyncioProp(PropApp):
 
     # __________________________________________________________________
     def __init__(self, argv, client, debugging_mqtt=False):
+        self._loop = None
+        self._asyncioMqtt = None
+
         super().__init__(argv, client, debugging_mqtt)
 
-        self.addPeriodicAction("send all data", self._sendAllDataPeriodicTask, PUBLISHALLDATA_PERIOD)
+        self._coalescingLock = threading.Lock()
+        self._coalescing = False
+        self._coalescedMessages = []
+
+        self._addSendAllDataAction(PUBLISHALLDATA_PERIOD)
 
     # __________________________________________________________________
-    async def _sendAllDataPeriodicTask(self, period):
-        while True:
-            self.sendAllData()
-            await asyncio.sleep(period)
+    def _flushDataChanges(self):
+        with self._coalescingLock:
+            super().sendDataChanges()
+            for message in self._coalescedMessages:
+                self._publishMessage(self._mqttOutbox, message)
+            self._coalescedMessages = []
+            self._coalescing = False
+
+    # __________________________________________________________________
+    def _mqttOnConnect(self, client, userdata, flags, rc):
+        super()._mqttOnConnect(client, userdata, flags, rc)
+        if rc == 0 and self._asyncioMqtt:
+            self._asyncioMqtt.connected()
+
+    # __________________________________________________________________
+    def _sendAfterDataChanges(self, message):
+        with self._coalescingLock:
+            if self._coalescing:
+                self._coalescedMessages.append(message)
+                return
+        self._publishMessage(self._mqttOutbox, message)
 
     # __________________________________________________________________
     async def _sendDataChangesPeriodicTask(self, period):
@@ -32,13 +80,59 @@ class AsyncioProp(PropApp):
             self.sendDataChanges()
             await asyncio.sleep(period)
 
+    # __________________________________________________________________
+    def sendDataChanges(self):
+        if self._loop is None or DATA_COALESCING_WINDOW <= 0:
+            super().sendDataChanges()
+            return
+        with self._coalescingLock:
+            if self._coalescing:
+                return
+            self._coalescing = True
+        # onMessage() may run in the Paho thread
+        self._loop.call_soon_threadsafe(self._loop.call_later, DATA_COALESCING_WINDOW, self._flushDataChanges)
+
+    # __________________________________________________________________
+    def sendDone(self, action):
+        self._sendAfterDataChanges("DONE " + action)
+
+    # __________________________________________________________________
+    def sendOmit(self, action):
+        self._sendAfterDataChanges("OMIT " + action)
+
+    # __________________________________________________________________
+    def start(self):
+        if MQTT_ASYNCIO_TRANSPORT:
+            # connection is started in withEventLoop()
+            self._prepareConnection()
+            try:
+                self._mqttClient.connect_async(self._mqttServerHost, port=self._mqttServerPort,
+                                               keepalive=MQTT_KEEPALIVE)
+            except Exception as e:
+                self._logger.error("MQTT API : failed to call connect_async()")
+                self._logger.debug(e)
+        else:
+            super().start()
+
     # __________________________________________________________________
     def withEventLoop(self, loop):
+        self._loop = loop
+
+        if MQTT_ASYNCIO_TRANSPORT:
+            self._asyncioMqtt = AsyncioMqtt(loop, self._mqttClient, self._logger)
+            self._asyncioMqtt.start()
+
         # Periodic actions
-        for title, (func, time) in self._periodicActions.items():
+        scheduled = []
+        for title, (func, time, priority, jitter, delay) in self._periodicActions.items():
+            if not asyncio.iscoroutinefunction(func):
+                scheduled.append((title, func, time, priority, jitter, delay))
+                continue
             try:
                 loop.create_task(func(time))
                 self._logger.info("Periodic task created '{0}' every {1} seconds".format(title, time))
             except Exception as e:
                 self._logger.error("Failed to create periodic task '{0}'".format(title))
                 self._logger.debug(e)
+
+        self._startScheduler(loop.call_later, scheduled)
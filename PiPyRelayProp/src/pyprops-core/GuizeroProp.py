@@ -5,6 +5,11 @@ GuizeroProp.py
 MIT License (c) Faure Systems <dev at faure dot systems>
 
 Add guizero and Tkinter to PropApp.
+
+Periodic actions are run by the PeriodicScheduler on Tkinter timers, they no longer
+re-arm themselves: playInSeconds() called by a periodic action for itself (the way
+actions were made periodic before) is ignored with a warning, so the action is not
+run twice per period.
 """
 
 from constants import *
@@ -24,25 +29,25 @@ class GuizeroProp(PropApp):
         self._gui = App(WINDOW_TITLE)
 
         self._relaunched = False
+        self._rearmWarnings = set()
 
         if platform.system() != 'Windows':
             signal.signal(signal.SIGUSR1, self.receiveSignal)
 
         self._gui.tk.after(500, self.poll) # for signals
 
-        self.addPeriodicAction("send all data", self.sendAllDataPeriodically, PUBLISHALLDATA_PERIOD)
+        self._addSendAllDataAction(PUBLISHALLDATA_PERIOD)
         self._gui.tk.after(1, self._startPeriodicTasks) # when derived class is built
 
     # __________________________________________________________________
     def _startPeriodicTasks(self):
         # Periodic actions
-        for title, (func, time) in self._periodicActions.items():
-            try:
-                self._gui.tk.after(0, func)
-                self._logger.info("Periodic task created '{0}' every {1} seconds".format(title, time))
-            except Exception as e:
-                self._logger.error("Failed to create periodic task '{0}'".format(title))
-                self._logger.debug(e)
+        actions = [(title,) + action for title, action in self._periodicActions.items()]
+        try:
+            self._startScheduler(lambda delay, callback: self._gui.tk.after(int(delay * 1000), callback), actions)
+        except Exception as e:
+            self._logger.error("Failed to create periodic tasks")
+            self._logger.debug(e)
 
     # __________________________________________________________________
     def loop(self):
@@ -81,6 +86,13 @@ class GuizeroProp(PropApp):
 
     # __________________________________________________________________
     def playInSeconds(self, func, time):
+        task = self._scheduler.current() if self._scheduler else None
+        if task is not None and task.func == func:
+            if task.title not in self._rearmWarnings:
+                self._rearmWarnings.add(task.title)
+                self._logger.warning("Periodic action '{0}' re-arms itself, re-arm ignored (run every {1} seconds "
+                                     "by the scheduler)".format(task.title, task.period))
+            return
         try:
             self._gui.tk.after(int(time*1000), func)
         except Exception as e:
@@ -125,8 +137,3 @@ class GuizeroProp(PropApp):
         except Exception as e:
             self._logger.error("MQTT API : failed to call connect_async()")
             self._logger.debug(e)
-
-    # __________________________________________________________________
-    def sendAllDataPeriodically(self):
-        self.sendAllData()
-        self.playInSeconds(self.sendAllDataPeriodically, PUBLISHALLDATA_PERIOD)
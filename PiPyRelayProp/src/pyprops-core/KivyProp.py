@@ -15,6 +15,8 @@ import configparser, codecs, yaml
 import logging, logging.config
 import argparse
 import os
+
+from PropDataRegistry import PropDataRegistry
 		
 class KivyProp(App):
 
@@ -30,6 +32,9 @@ class KivyProp(App):
 		self._mqttOutbox = None
 		self._mqttServerHost = MQTT_DEFAULT_HOST
 		self._mqttServerPort = MQTT_DEFAULT_PORT
+		self._publishable = PropDataRegistry()
+		self._dirtyData = {}
+		self._periodicActions = {}
 
 		ini = 'definitions.ini'
 		if os.path.isfile(ini):
@@ -284,7 +289,8 @@ class KivyProp(App):
 
 	# __________________________________________________________________
 	def addData(self, data):
-		self._publishable.append(data)
+		self._publishable.add(data)
+		data.track(self._dirtyData)
 
 	# __________________________________________________________________
 	def addPeriodicAction(self, title, func, time):
@@ -294,9 +300,15 @@ class KivyProp(App):
 			self._periodicActions[title] = (func, time)
 			self._logger.info("New periodic action added '{0}' every {1} seconds".format(title, time))
 
+	# __________________________________________________________________
+	def getData(self, name):
+		return self._publishable.get(name)
+
 	# __________________________________________________________________
 	def removeData(self, data):
 		self._publishable.remove(data)
+		self._dirtyData.pop(data, None)
+		data.track(None)
 
 	# __________________________________________________________________
 	def sendData(self, data):
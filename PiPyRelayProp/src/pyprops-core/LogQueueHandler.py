@@ -0,0 +1,23 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LogQueueHandler.py
+MIT License (c) Faure Systems <dev at faure dot systems>
+
+QueueHandler for a QueueListener thread of the same process: the message is merged
+with its args when the record is logged, so it shows the values at log time, while
+the formatter (time stamp, level, exception text) and I/O are left to the listener
+handlers.
+"""
+
+import logging.handlers
+
+
+class LogQueueHandler(logging.handlers.QueueHandler):
+
+    # __________________________________________________________________
+    def prepare(self, record):
+        # the stock prepare() also runs the formatter in the calling thread, for pickling
+        record.msg = record.getMessage()
+        record.args = None
+        return record
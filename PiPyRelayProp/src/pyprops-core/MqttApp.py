@@ -8,9 +8,13 @@ App base class handling props app wide Paho MQTT client:
 - make all app subscriptions (app-inbox and mqtt-sub-* topics)
 - publish messages with _publishMessage(), _publishAllData() and _publishDataChanges()
 - receive messages exposing onMessage() virtual method
+- receive inbox commands parsed from raw payload with parseCommand() and onCommand() virtual methods
+- receive binary frames on app-inbox + MQTT_BINARY_SUFFIX with onBinaryMessage() virtual method
 - expose onConnect() and onDisconnect() virtual methods
-- handle logging defined in logging.ini
-- parse props app arguments
+- track messages not yet acknowledged by the broker and the time of the last full DATA
+- handle logging defined in logging.ini, formatting and file I/O of the app and root
+  logger handlers in QueueListener threads
+- parse props app arguments (--profile-startup prints startup phase timings)
 
 Configured with:
 -  constants.py
@@ -20,6 +24,9 @@ Configured with:
     MQTT_DEFAULT_PORT
     MQTT_DEFAULT_QoS
     MQTT_KEEPALIVE
+    MQTT_LOG_SAMPLING (log 1 of N received/sent/published message lines)
+    MQTT_BINARY_SUFFIX (binary inbox/outbox topic suffix, None to disable)
+    LOGGING_QUEUE
 - definitions.ini
     app-inbox
     app-outbox
@@ -53,11 +60,31 @@ try:
     MQTT_KEEPALIVE
 except NameError:
     MQTT_KEEPALIVE = 15
+try:
+    MQTT_LOG_SAMPLING
+except NameError:
+    MQTT_LOG_SAMPLING = 1
+try:
+    MQTT_BINARY_SUFFIX
+except NameError:
+    MQTT_BINARY_SUFFIX = None
+try:
+    LOGGING_QUEUE
+except NameError:
+    LOGGING_QUEUE = True
 
-import configparser, codecs, yaml
-import logging, logging.config
+import configparser, codecs
+import logging, logging.handlers
 import argparse
+import atexit
 import os
+import queue
+import time
+
+from LogQueueHandler import LogQueueHandler
+from MqttInflight import MqttInflight
+from PropDataRegistry import PropDataRegistry
+import StartupProfile
 
 
 class MqttApp():
@@ -71,9 +98,14 @@ class MqttApp():
         self._mqttSubscriptions = []
         self._mqttInbox = None
         self._mqttOutbox = None
+        self._mqttBinaryInbox = None
+        self._mqttBinaryOutbox = None
         self._mqttServerHost = MQTT_DEFAULT_HOST
         self._mqttServerPort = MQTT_DEFAULT_PORT
-        self._publishable = []
+        self._publishable = PropDataRegistry()
+        self._logListeners = []
+        self._logSamplingCount = 0
+        self._dirtyData = {}  # PropData changed since last publish, dict as ordered set
 
         ini = 'definitions.ini'
         if os.path.isfile(ini):
@@ -90,16 +122,25 @@ class MqttApp():
                     if key == 'app-outbox':
                         self._mqttOutbox = self._definitions[key]
 
+        if MQTT_BINARY_SUFFIX and self._mqttInbox and self._mqttOutbox:
+            self._mqttBinaryInbox = self._mqttInbox + MQTT_BINARY_SUFFIX
+            self._mqttBinaryOutbox = self._mqttOutbox + MQTT_BINARY_SUFFIX
+            self._mqttSubscriptions.append(self._mqttBinaryInbox)
+
         if os.path.isfile(CONFIG_FILE):
+            import yaml  # not imported at all without config file
             with open(CONFIG_FILE, 'r') as conffile:
                 self._config = yaml.load(conffile, Loader=yaml.SafeLoader)
         else:
             self._config = {}
+        config_changed = False
 
         print('Config:', self._config)
 
         self._mqttClient = client
         self._mqttConnected = False
+        self._mqttInflight = MqttInflight()  # mids published and not yet acknowledged
+        self._allDataTime = None  # time.monotonic() of the last full DATA sent
         if 'host' in self._config:
             self._mqttServerHost = self._config['host']
         if 'port' in self._config:
@@ -120,18 +161,24 @@ class MqttApp():
         parser.add_argument("-p", "--port", help="change MQTT server port", nargs=1, type=int)
         parser.add_argument("-d", "--debug", help="set DEBUG log level", action='store_true')
         parser.add_argument("-l", "--logger", help="use logging config file", nargs=1)
+        parser.add_argument("--profile-startup", help="print startup phase timings", action='store_true')
         args = vars(parser.parse_args())
 
         if args['server']:
             self._mqttServerHost = args['server'][0]
+            config_changed = config_changed or self._config.get('host') != self._mqttServerHost
             self._config['host'] = self._mqttServerHost
 
         if args['port']:
             self._mqttServerPort = args['port'][0]
-            self._config['port'] = self._mqttServerHost
+            config_changed = config_changed or self._config.get('port') != self._mqttServerPort
+            self._config['port'] = self._mqttServerPort
+
+        StartupProfile.mark('config')
 
         if args['logger'] and os.path.isfile(args['logger']):
-            logging.config.fileConfig(args['logger'])
+            import logging.config as logging_config
+            logging_config.fileConfig(args['logger'])
             if args['debug']:
                 self._logger = logging.getLogger('debug')
                 self._logger.setLevel(logging.DEBUG)
@@ -139,7 +186,8 @@ class MqttApp():
                 self._logger = logging.getLogger('production')
                 self._logger.setLevel(logging.INFO)
         elif os.path.isfile('logging.ini'):
-            logging.config.fileConfig('logging.ini')
+            import logging.config as logging_config
+            logging_config.fileConfig('logging.ini')
             if args['debug']:
                 self._logger = logging.getLogger('debug')
                 self._logger.setLevel(logging.DEBUG)
@@ -157,13 +205,21 @@ class MqttApp():
             ch.setLevel(logging.INFO)
             self._logger.addHandler(ch)
 
+        if LOGGING_QUEUE:
+            self._queueLogging()
+
+        StartupProfile.mark('logging')
+
         if self._mqttInbox is None:
             self._logger.warning("Props inbox topic is not defined")
         if self._mqttOutbox is None:
             self._logger.warning("Props outbox topic is not defined")
 
-        with open(CONFIG_FILE, 'w') as conffile:
-            yaml.dump(self._config, conffile, default_flow_style=False)
+        if config_changed:
+            # rewritten only when arguments changed it
+            import yaml
+            with open(CONFIG_FILE, 'w') as conffile:
+                yaml.dump(self._config, conffile, default_flow_style=False)
 
         self.start()
 
@@ -175,6 +231,8 @@ class MqttApp():
     def _mqttOnConnect(self, client, userdata, flags, rc):
         if rc == 0:
             self._mqttConnected = True
+            self._mqttInflight.clear()
+            StartupProfile.mark('mqtt connected')
             # self._logger.debug("Connected to MQTT server with flags: ", flags) # flags is dict
             self._logger.info("Program connected to MQTT server")
             if self._mqttOutbox:
@@ -182,6 +240,7 @@ class MqttApp():
                     message = "CONNECTED"
                     (result, mid) = self._mqttClient.publish(self._mqttOutbox, message, qos=MQTT_DEFAULT_QoS,
                                                              retain=True)
+                    self._mqttInflight.published(result, mid)
                     self._logger.info("{0} '{1}' (mid={2}) on {3}".format("Program sending message", message, mid,
                                                                           self._mqttOutbox))
                 except Exception as e:
@@ -242,6 +301,17 @@ class MqttApp():
 
     # __________________________________________________________________
     def _mqttOnMessage(self, client, userdata, msg):
+        if msg.topic == self._mqttInbox:
+            command = self.parseCommand(msg.payload)
+            if command is not None:
+                self._logSampled("Message received : '%s' in %s", command.message, msg.topic)
+                self.onCommand(command)
+                return
+        elif msg.topic == self._mqttBinaryInbox:
+            self._logSampled("Binary message received : %s in %s", msg.payload.hex(), msg.topic)
+            self.onBinaryMessage(msg.payload)
+            return
+
         message = None
         try:
             message = msg.payload.decode(encoding="utf-8", errors="strict")
@@ -249,18 +319,18 @@ class MqttApp():
             pass
 
         if message:
-            self._logger.info("Message received : '" + message + "' in " + msg.topic)
+            self._logSampled("Message received : '%s' in %s", message, msg.topic)
             if msg.topic == self._mqttInbox and message == "@PING":
                 self._publishMessage(self._mqttOutbox, "PONG")
             else:
                 self.onMessage(msg.topic, message)
         else:
-            self._logger.warning("{0} {1}".format("MQTT message decoding failed on"), msg.topic)
+            self._logger.warning("MQTT message decoding failed on %s", msg.topic)
 
     # __________________________________________________________________
     def _mqttOnPublish(self, client, userdata, mid):
-        self._logger.debug("MQTT message is published : mid=%s userdata=%s", mid, userdata)
-        self._logger.info("{0} (mid={1})".format("Message published", mid))
+        self._mqttInflight.acknowledged(mid)
+        self._logSampled("Message published (mid=%s)", mid)
 
     # __________________________________________________________________
     def _mqttOnSubscribe(self, client, userdata, mid, granted_qos):
@@ -273,6 +343,16 @@ class MqttApp():
         self._logger.debug("MQTT topic is unsubscribed : mid=%s", mid)
         self._logger.info("{0} (mid={1})".format("Program has been unsusbcribed from topic", mid))
 
+    # __________________________________________________________________
+    def onBinaryMessage(self, payload):
+        # extend as a virtual method
+        self._logger.warning("Binary message ignored : %s", payload.hex())
+
+    # __________________________________________________________________
+    def onCommand(self, command):
+        # extend as a virtual method
+        pass
+
     # __________________________________________________________________
     def onConnect(self, client, userdata, flags, rc):
         # extend as a virtual method
@@ -289,26 +369,60 @@ class MqttApp():
         print(topic, message)
         self.sendOmit(message)
 
+    # __________________________________________________________________
+    def _logSampled(self, msg, *args):
+        # per-message lines, formatted lazily and only 1 of MQTT_LOG_SAMPLING is logged
+        self._logSamplingCount += 1
+        if self._logSamplingCount >= MQTT_LOG_SAMPLING:
+            self._logSamplingCount = 0
+            self._logger.info(msg, *args)
+
+    # __________________________________________________________________
+    def parseCommand(self, payload):
+        # extend as a virtual method, return None to receive payload as message in onMessage()
+        return None
+
     # __________________________________________________________________
     def _publishAllData(self):
         if self._publishable:
-            all_data = []
-            for publishable in self._publishable:
-                all_data.append(str(publishable))
-            if all_data:
-                data = " ".join(all_data)
-                data = data.strip()
-                if data:
-                    self.sendData(data)
+            # PropData cache their fragment so the payload is a single join
+            data = " ".join([str(publishable) for publishable in self._publishable])
+            self._dirtyData.clear()
+            data = data.strip()
+            if data:
+                self.sendData(data)
+                if self._mqttConnected:
+                    self._allDataTime = time.monotonic()
+
+    # __________________________________________________________________
+    def _publishBinaryMessage(self, payload):
+        if not self._mqttBinaryOutbox:
+            self._logger.warning("Program failed to send binary message (no topic)")
+        elif self._mqttConnected:
+            try:
+                (result, mid) = self._mqttClient.publish(self._mqttBinaryOutbox, payload, qos=MQTT_DEFAULT_QoS,
+                                                         retain=False)
+                self._mqttInflight.published(result, mid)
+                self._logSampled("Program sending binary message %s (mid=%s) on %s", payload.hex(), mid,
+                                 self._mqttBinaryOutbox)
+            except Exception as e:
+                self._logger.error("MQTT API : failed to call publish() for binary message on %s",
+                                   self._mqttBinaryOutbox)
+                self._logger.debug(e)
+        else:
+            self._logger.warning("Program failed to send binary message (disconnected)")
 
     # __________________________________________________________________
     def _publishDataChanges(self):
-        if self._publishable:
+        # only data marked by PropData.update() are visited
+        if self._dirtyData:
             changes = []
-            for publishable in self._publishable:
+            for publishable in list(self._dirtyData):
                 change = publishable.change()
                 if isinstance(change, str):
                     changes.append(change)
+                if not publishable.pending():
+                    del self._dirtyData[publishable]
             if changes:
                 data = " ".join(changes)
                 data = data.strip()
@@ -322,17 +436,33 @@ class MqttApp():
         elif self._mqttConnected:
             try:
                 (result, mid) = self._mqttClient.publish(topic, message, qos=MQTT_DEFAULT_QoS, retain=False)
-                self._logger.info(
-                    "{0} '{1}' (mid={2}) on {3}".format("Program sending message", message, mid, topic))
+                self._mqttInflight.published(result, mid)
+                self._logSampled("Program sending message '%s' (mid=%s) on %s", message, mid, topic)
             except Exception as e:
-                self._logger.error(
-                    "{0} '{1}' on {2}".format("MQTT API : failed to call publish() for", message, topic))
+                self._logger.error("MQTT API : failed to call publish() for '%s' on %s", message, topic)
                 self._logger.debug(e)
         else:
-            self._logger.warning("{0} : '{1}'".format("Program failed to send message (disconnected)", message))
+            self._logger.warning("Program failed to send message (disconnected) : '%s'", message)
 
     # __________________________________________________________________
-    def start(self):
+    def _queueLogging(self):
+        # formatting, file and console writes are moved to QueueListener threads, one per logger
+        # so records still reach the handlers of their logger only (propagate=0 in logging.ini)
+        for logger in (self._logger, logging.getLogger()):
+            handlers = list(logger.handlers)
+            if not handlers:
+                continue
+            log_queue = queue.SimpleQueue()
+            for handler in handlers:
+                logger.removeHandler(handler)
+            logger.addHandler(LogQueueHandler(log_queue))
+            listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+            listener.start()
+            atexit.register(listener.stop)
+            self._logListeners.append(listener)
+
+    # __________________________________________________________________
+    def _prepareConnection(self):
         if self._mqttOutbox:
             try:
                 # will must be set before connection
@@ -344,6 +474,10 @@ class MqttApp():
         mydata = {'host': self._mqttServerHost, 'port': self._mqttServerPort}
         self._mqttClient.user_data_set(str(mydata))
 
+    # __________________________________________________________________
+    def start(self):
+        self._prepareConnection()
+
         '''
         The loop_start() starts a new thread, that calls the loop method at 
         regular intervals for you. It also handles re-connects automatically.
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MqttInflight.py
+MIT License (c) Faure Systems <dev at faure dot systems>
+
+Mids of the MQTT messages published and not yet acknowledged, shared by MqttApp and
+QtMqttApp (len() is the congestion count used by PeriodicActions.py):
+- published(result, mid) after publish(), the mid is tracked only if result is success
+- acknowledged(mid) from on_publish, which may come first from the Paho thread: the
+  ack is then kept as seen and consumed by published()
+- clear() on (re)connection
+"""
+
+import paho.mqtt.client as mqtt
+import threading
+import time
+
+EARLY_ACK_DELAY = 1.0  # seconds an ack seen before its publish() returned is kept for
+
+
+class MqttInflight:
+
+    # __________________________________________________________________
+    def __init__(self):
+        self._pending = set()
+        self._seenAcks = {}  # mid -> monotonic time of an ack seen before publish() returned
+        self._lock = threading.Lock()
+
+    # __________________________________________________________________
+    def __len__(self):
+        return len(self._pending)
+
+    # __________________________________________________________________
+    def acknowledged(self, mid):
+        with self._lock:
+            if mid in self._pending:
+                self._pending.discard(mid)
+            else:
+                # either publish() has not returned yet or the mid was not tracked
+                now = time.monotonic()
+                if len(self._seenAcks) > 256:
+                    self._seenAcks = {m: t for m, t in self._seenAcks.items() if now - t < EARLY_ACK_DELAY}
+                self._seenAcks[mid] = now
+
+    # __________________________________________________________________
+    def clear(self):
+        with self._lock:
+            self._pending.clear()
+            self._seenAcks.clear()
+
+    # __________________________________________________________________
+    def published(self, result, mid):
+        if result != mqtt.MQTT_ERR_SUCCESS:
+            return
+        with self._lock:
+            seen = self._seenAcks.pop(mid, None)
+            if seen is None or time.monotonic() - seen > EARLY_ACK_DELAY:
+                self._pending.add(mid)
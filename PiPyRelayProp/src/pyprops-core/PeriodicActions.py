@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+PeriodicActions.py
+MIT License (c) Faure Systems <dev at faure dot systems>
+
+Periodic actions of the props, mixed in PropApp and QtPropApp so both run them
+with the same semantics:
+- addPeriodicAction() registers an action, first run after delay seconds (0 by default)
+- _startScheduler() runs them on a PeriodicScheduler (see PeriodicScheduler.py),
+  given the event loop timer
+- run-time stats are logged every PERIODIC_STATS_PERIOD seconds (0 to disable)
+
+The periodic full DATA snapshot ("send all data"), added by _addSendAllDataAction(),
+is spread over a fleet of props:
+- PUBLISHALLDATA_RANDOM_PHASE: first snapshot at a random time within the period
+- PUBLISHALLDATA_JITTER: random delay in seconds added to each snapshot
+- PUBLISHALLDATA_RECENT: skipped if a full DATA was sent within these seconds (app:data)
+- MQTT_INFLIGHT_CONGESTION: above this count of unacknowledged messages (see
+  MqttInflight.py) the next snapshots are sent every 2, 4... up to
+  PUBLISHALLDATA_MAX_BACKOFF periods, back to every period as congestion clears
+  (0 to disable)
+
+The app calls _initPeriodicActions() from its __init__().
+"""
+
+from constants import *
+
+try:
+    PERIODIC_STATS_PERIOD
+except NameError:
+    PERIODIC_STATS_PERIOD = 0
+try:
+    PUBLISHALLDATA_JITTER
+except NameError:
+    PUBLISHALLDATA_JITTER = 0.0
+try:
+    PUBLISHALLDATA_RANDOM_PHASE
+except NameError:
+    PUBLISHALLDATA_RANDOM_PHASE = False
+try:
+    PUBLISHALLDATA_RECENT
+except NameError:
+    PUBLISHALLDATA_RECENT = 0
+try:
+    PUBLISHALLDATA_MAX_BACKOFF
+except NameError:
+    PUBLISHALLDATA_MAX_BACKOFF = 1
+try:
+    MQTT_INFLIGHT_CONGESTION
+except NameError:
+    MQTT_INFLIGHT_CONGESTION = 0
+
+from PeriodicScheduler import PeriodicScheduler, PRIORITY_LOW, PRIORITY_NORMAL
+import random
+import time
+
+
+class PeriodicActions:
+
+    # __________________________________________________________________
+    def _initPeriodicActions(self):
+        self._periodicActions = {}
+        self._scheduler = None
+        self._allDataBackoff = 1
+        self._allDataSkips = 0
+
+    # __________________________________________________________________
+    def _addSendAllDataAction(self, period):
+        delay = random.uniform(0, period) if PUBLISHALLDATA_RANDOM_PHASE else 0.0
+        self.addPeriodicAction("send all data", self._sendAllDataPeriodically, period, PRIORITY_LOW,
+                               PUBLISHALLDATA_JITTER, delay)
+
+    # __________________________________________________________________
+    def _sendAllDataPeriodically(self):
+        if self._allDataTime is not None and time.monotonic() - self._allDataTime < PUBLISHALLDATA_RECENT:
+            return
+        if self._allDataSkips > 0:
+            self._allDataSkips -= 1
+            return
+        if 0 < MQTT_INFLIGHT_CONGESTION < len(self._mqttInflight):
+            backoff = min(self._allDataBackoff * 2, PUBLISHALLDATA_MAX_BACKOFF)
+            if backoff != self._allDataBackoff:
+                self._logger.warning("Full DATA sent every {0} periods ({1} messages not acknowledged)".format(
+                    backoff, len(self._mqttInflight)))
+        else:
+            backoff = max(self._allDataBackoff // 2, 1)
+        self._allDataBackoff = backoff
+        self._allDataSkips = backoff - 1
+        self.sendAllData()
+
+    # __________________________________________________________________
+    def _startScheduler(self, arm, actions):
+        # actions are (title, func, time, priority, jitter, delay)
+        self._scheduler = PeriodicScheduler(arm, self._logger)
+        for title, func, time, priority, jitter, delay in actions:
+            try:
+                self._scheduler.add(title, func, time, priority, jitter, delay)
+                self._logger.info("Periodic task created '{0}' every {1} seconds".format(title, time))
+            except Exception as e:
+                self._logger.error("Failed to create periodic task '{0}'".format(title))
+                self._logger.debug(e)
+        if PERIODIC_STATS_PERIOD > 0:
+            self._scheduler.add("log periodic stats", self._scheduler.logStats, PERIODIC_STATS_PERIOD,
+                                PRIORITY_LOW, delay=PERIODIC_STATS_PERIOD)
+        self._scheduler.start()
+
+    # __________________________________________________________________
+    def addPeriodicAction(self, title, func, time, priority=PRIORITY_NORMAL, jitter=0.0, delay=0.0):
+        # first run after delay seconds
+        if title in self._periodicActions:
+            self._logger.warning("Duplicate periodic action ignored '{0}' every {1} seconds".format(title, time))
+        else:
+            self._periodicActions[title] = (func, time, priority, jitter, delay)
+            self._logger.info("New periodic action added '{0}' every {1} seconds".format(title, time))
+
+    # __________________________________________________________________
+    def getPeriodicStats(self):
+        # PeriodicTask by title, see PeriodicScheduler.py
+        if self._scheduler is None:
+            return {}
+        return self._scheduler.stats()
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+PeriodicScheduler.py
+MIT License (c) Faure Systems <dev at faure dot systems>
+
+Periodic actions of the props, agnostic to asyncio, Qt or Tkinter:
+- drift-free deadlines, next deadline is the previous one plus the period,
+  missed periods are skipped (and counted) instead of run in burst
+- when several actions are due, the one with the lowest priority value runs first
+- one action per timer shot, so the event loop dispatches pending MQTT messages
+  (commands) between two periodic actions
+- optional jitter, a random delay in [0, jitter] added to each deadline without
+  shifting the next ones
+- run-time stats per action
+
+The event loop is given by arm(delay, callback), which must call callback()
+once after delay seconds in the loop thread:
+    asyncio  : loop.call_later(delay, callback)
+    Qt       : QTimer.singleShot(int(delay * 1000), callback)
+    Tkinter  : tk.after(int(delay * 1000), callback)
+"""
+
+import functools
+import heapq
+import random
+import time
+
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 1
+PRIORITY_LOW = 2
+
+
+class PeriodicTask:
+    __slots__ = ('title', 'func', 'period', 'priority', 'jitter', 'nominal', 'deadline',
+                 'runs', 'skipped', 'totalTime', 'maxTime', 'maxLateness', 'errors')
+
+    # __________________________________________________________________
+    def __init__(self, title, func, period, priority, jitter):
+        self.title = title
+        self.func = func
+        self.period = period
+        self.priority = priority
+        self.jitter = jitter
+        self.nominal = 0.0  # drift-free deadline
+        self.deadline = 0.0  # nominal deadline plus jitter
+        self.runs = 0
+        self.skipped = 0
+        self.totalTime = 0.0
+        self.maxTime = 0.0
+        self.maxLateness = 0.0
+        self.errors = 0
+
+    # __________________________________________________________________
+    def __str__(self):
+        mean = self.totalTime / self.runs if self.runs else 0.0
+        return "'{0}' runs={1} skipped={2} errors={3} mean={4:.2f}ms max={5:.2f}ms late={6:.2f}ms".format(
+            self.title, self.runs, self.skipped, self.errors, mean * 1000, self.maxTime * 1000,
+            self.maxLateness * 1000)
+
+
+class PeriodicScheduler:
+
+    # __________________________________________________________________
+    def __init__(self, arm, logger, clock=time.monotonic):
+        super().__init__()
+
+        self._arm = arm
+        self._logger = logger
+        self._clock = clock
+        self._tasks = {}
+        self._waiting = []  # heap of (deadline, seq, task)
+        self._ready = []  # heap of (priority, deadline, seq, task), due tasks
+        self._seq = 0
+        self._generation = 0  # only the last armed timer shot is served
+        self._armed = None  # deadline of the armed timer shot
+        self._started = False
+        self._current = None  # task being run
+
+    # __________________________________________________________________
+    def _fire(self, generation):
+        if generation != self._generation:
+            return
+        self._armed = None
+
+        now = self._clock()
+        while self._waiting and self._waiting[0][0] <= now:
+            deadline, seq, task = heapq.heappop(self._waiting)
+            heapq.heappush(self._ready, (task.priority, deadline, seq, task))
+
+        if self._ready:
+            task = heapq.heappop(self._ready)[3]
+            self._run(task, now)
+            self._push(task)
+
+        self._rearm()
+
+    # __________________________________________________________________
+    def _push(self, task):
+        self._seq += 1
+        heapq.heappush(self._waiting, (task.deadline, self._seq, task))
+
+    # __________________________________________________________________
+    def _rearm(self):
+        if not self._started:
+            return
+        if self._ready:
+            deadline = self._clock()
+        elif self._waiting:
+            deadline = self._waiting[0][0]
+        else:
+            return
+        if self._armed is not None and self._armed <= deadline:
+            return
+        self._generation += 1
+        self._armed = deadline
+        self._arm(max(0.0, deadline - self._clock()), functools.partial(self._fire, self._generation))
+
+    # __________________________________________________________________
+    def _run(self, task, now):
+        lateness = now - task.deadline
+        if lateness > task.maxLateness:
+            task.maxLateness = lateness
+        start = time.perf_counter()
+        self._current = task
+        try:
+            task.func()
+        except Exception as e:
+            task.errors += 1
+            self._logger.error("Periodic task '{0}' failed".format(task.title))
+            self._logger.debug(e)
+        self._current = None
+        elapsed = time.perf_counter() - start
+        task.runs += 1
+        task.totalTime += elapsed
+        if elapsed > task.maxTime:
+            task.maxTime = elapsed
+
+        task.nominal += task.period
+        end = self._clock()
+        if task.nominal <= end:
+            missed = int((end - task.nominal) // task.period) + 1
+            task.skipped += missed
+            task.nominal += missed * task.period
+        task.deadline = task.nominal + (random.uniform(0, task.jitter) if task.jitter > 0 else 0.0)
+
+    # __________________________________________________________________
+    def add(self, title, func, period, priority=PRIORITY_NORMAL, jitter=0.0, delay=0.0):
+        # first run after delay seconds (plus jitter) once started
+        task = PeriodicTask(title, func, period, priority, jitter)
+        task.nominal = self._clock() + delay
+        task.deadline = task.nominal + (random.uniform(0, jitter) if jitter > 0 else 0.0)
+        self._tasks[title] = task
+        self._push(task)
+        self._rearm()
+        return task
+
+    # __________________________________________________________________
+    def current(self):
+        # task being run, None between two tasks
+        return self._current
+
+    # __________________________________________________________________
+    def logStats(self):
+        for task in self._tasks.values():
+            self._logger.info("Periodic task {0}".format(task))
+
+    # __________________________________________________________________
+    def start(self):
+        # deadlines of the tasks added before start are kept
+        self._started = True
+        self._rearm()
+
+    # __________________________________________________________________
+    def stats(self):
+        return {title: task for title, task in self._tasks.items()}
@@ -15,35 +15,39 @@ Props base class extends MqttApp:
     OVER -> notify that a challenge is over
     REQU -> request a command to another props
     PROG -> request a control program
+
+Periodic actions are run by a PeriodicScheduler with drift-free deadlines, priorities
+and jitter (see PeriodicActions.py and PeriodicScheduler.py), the periodic full DATA
+snapshot is spread over a fleet of props (see PeriodicActions.py).
 """
 
 from constants import *
 from MqttApp import MqttApp
+from PeriodicActions import PeriodicActions
 
 
-class PropApp(MqttApp):
+class PropApp(MqttApp, PeriodicActions):
 
     # __________________________________________________________________
     def __init__(self, argv, client, debugging_mqtt=False):
         super().__init__(argv, client, debugging_mqtt)
 
-        self._periodicActions = {}
+        self._initPeriodicActions()
 
     # __________________________________________________________________
     def addData(self, data):
-        self._publishable.append(data)
+        self._publishable.add(data)
+        data.track(self._dirtyData)
 
     # __________________________________________________________________
-    def addPeriodicAction(self, title, func, time):
-        if title in self._periodicActions:
-            self._logger.warning("Duplicate periodic action ignored '{0}' every {1} seconds".format(title, time))
-        else:
-            self._periodicActions[title] = (func, time)
-            self._logger.info("New periodic action added '{0}' every {1} seconds".format(title, time))
+    def getData(self, name):
+        return self._publishable.get(name)
 
     # __________________________________________________________________
     def removeData(self, data):
         self._publishable.remove(data)
+        self._dirtyData.pop(data, None)
+        data.track(None)
 
     # __________________________________________________________________
     def sendAllData(self):
@@ -9,12 +9,14 @@ Class to track changes in variables and to publish them optimally in the props o
 
 
 class PropData:
+    __slots__ = ('_dirty', '_fragment', '_name', '_type', '_decimal', '_precision', '_true', '_false', '_value',
+                 '_reference')
 
     # __________________________________________________________________
     def __init__(self, name, type, initial, decimal=None, precision=1, alias=("1", "0"), logger=None):
-        super().__init__()
-
-        self._logger = logger
+        # logger is only used to report the creation, it is not kept
+        self._dirty = None
+        self._fragment = None  # cached 'name=value' string
         self._name = name
         self._type = type
         self._decimal = decimal
@@ -25,37 +27,37 @@ class PropData:
             v = int(str(initial))
             self._value = v
             self._reference = v + 1  # force an initial change
-            if self._logger:
-                self._logger.info(
+            if logger:
+                logger.info(
                     "{0} '{1}' {2}={3} {4}={5}".format("New int Publishable", self._name, "with initial", initial,
                                                        "and precision", self._precision))
         elif type == float:
             v = float(str(initial))
             self._value = v
             self._reference = v + 1.0  # force an initial change
-            if self._logger and self._decimal:
-                self._logger.info(
+            if logger and self._decimal:
+                logger.info(
                     "{0} '{1}' {2}={3} {4}={5} {6}={7}".format("New float Publishable", self._name, "with initial",
                                                                initial, "and precision", self._precision, "and decimal",
                                                                self._decimal))
-            elif self._logger:
-                self._logger.info(
+            elif logger:
+                logger.info(
                     "{0} '{1}' {2}={3} {4}={5}".format("New float Publishable", self._name, "with initial", initial,
                                                        "and precision", self._precision))
         elif type == str:
             self._value = initial
             self._reference = initial + "_"  # force an initial change
-            if self._logger:
+            if logger:
                 if initial:
-                    self._logger.info(
+                    logger.info(
                         "{0} '{1}' {2}={3}".format("New str Publishable", self._name, "with initial", initial))
                 else:
-                    self._logger.info("{0} '{1}' {2}=''".format("New str Publishable", self._name, "with initial"))
+                    logger.info("{0} '{1}' {2}=''".format("New str Publishable", self._name, "with initial"))
         elif type == bool:
             self._value = initial
             self._reference = not initial  # force an initial change
-            if self._logger:
-                self._logger.info(
+            if logger:
+                logger.info(
                     "{0} '{1}' ({2}/{3}) {4}={5}".format("New boolean Publishable", self._name, self._true, self._false,
                                                          "with initial", initial))
         else:
@@ -65,14 +67,20 @@ class PropData:
             self._reference = v + 1  # force an initial change
             self._decimal = None
             self._precision = 1
-            if self._logger:
-                self._logger.info(
+            if logger:
+                logger.info(
                     "{0} '{1}' {2}={3} {4}={5}".format("New incorrect Publishable created as int", self._name,
                                                        "with initial", initial, "and precision", self._precision))
 
     # __________________________________________________________________
     def __str__(self):
         self._reference = self._value
+        if self._fragment is None:
+            self._fragment = self._encode()
+        return self._fragment
+
+    # __________________________________________________________________
+    def _encode(self):
         if self._type == float and self._decimal:
             return "{0}={1:.{prec}f}".format(self._name, self._value, prec=self._decimal)
         elif self._type == int:
@@ -111,9 +119,29 @@ class PropData:
             else:
                 return None
 
+    # __________________________________________________________________
+    def name(self):
+        return self._name
+
+    # __________________________________________________________________
+    def pending(self):
+        # a change not published yet, may be below precision for int and float
+        return self._reference != self._value
+
+    # __________________________________________________________________
+    def track(self, dirty):
+        # dirty is the dict-based set of the app where update() marks this data
+        self._dirty = dirty
+        if dirty is not None:
+            dirty[self] = None
+
     # __________________________________________________________________
     def update(self, value):
+        if value != self._value or type(value) is not type(self._value):
+            self._fragment = None
         self._value = value
+        if self._dirty is not None:
+            self._dirty[self] = None
 
     # __________________________________________________________________
     def value(self):
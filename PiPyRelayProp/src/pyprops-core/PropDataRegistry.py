@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+PropDataRegistry.py
+MIT License (c) Faure Systems <dev at faure dot systems>
+
+Ordered registry of the PropData published by a props app:
+- O(1) add, remove and lookup by name, data without name (None) are not indexed
+- iterates in insertion order so the DATA payload layout is kept
+"""
+
+
+class PropDataRegistry:
+
+    # __________________________________________________________________
+    def __init__(self, datas=()):
+        super().__init__()
+
+        self._datas = {}  # PropData -> name, dict keeps insertion order
+        self._names = {}  # name -> {PropData: None}, several PropData may share a name
+        for data in datas:
+            self.add(data)
+
+    # __________________________________________________________________
+    def __bool__(self):
+        return bool(self._datas)
+
+    # __________________________________________________________________
+    def __contains__(self, data):
+        return data in self._datas
+
+    # __________________________________________________________________
+    def __iter__(self):
+        return iter(self._datas)
+
+    # __________________________________________________________________
+    def __len__(self):
+        return len(self._datas)
+
+    # __________________________________________________________________
+    def add(self, data):
+        if data not in self._datas:
+            self._datas[data] = data.name()
+            if data.name() is not None:
+                self._names.setdefault(data.name(), {})[data] = None
+
+    # __________________________________________________________________
+    def clear(self):
+        self._datas = {}
+        self._names = {}
+
+    # __________________________________________________________________
+    def get(self, name, default=None):
+        datas = self._names.get(name)
+        if datas:
+            return next(iter(datas))
+        return default
+
+    # __________________________________________________________________
+    def remove(self, data):
+        name = self._datas.pop(data)
+        if name is None:
+            return
+        datas = self._names[name]
+        del datas[data]
+        if not datas:
+            del self._names[name]
+
+    # __________________________________________________________________
+    def replace(self, datas):
+        # bulk replace, e.g. for a wiring reload
+        self.clear()
+        for data in datas:
+            self.add(data)
@@ -9,6 +9,7 @@ App base class extending QCoreApplication or QApplication with Paho MQTT client:
 - publish messages with _publishMessage(), _publishAllData() and _publishDataChanges()
 - receive messages exposing onMessage() virtual method
 - expose onConnect() and onDisconnect() virtual methods
+- track messages not yet acknowledged by the broker and the time of the last full DATA
 - handle logging defined in logging.ini
 - parse prop app arguments
 
@@ -58,6 +59,10 @@ import configparser, codecs, yaml
 import logging, logging.config
 import argparse
 import os
+import time
+
+from MqttInflight import MqttInflight
+from PropDataRegistry import PropDataRegistry
 
 try:
     if QTGUI:
@@ -86,7 +91,8 @@ class QtMqttApp(QAPP):
         self._mqttOutbox = None
         self._mqttServerHost = MQTT_DEFAULT_HOST
         self._mqttServerPort = MQTT_DEFAULT_PORT
-        self._publishable = []
+        self._publishable = PropDataRegistry()
+        self._dirtyData = {}  # PropData changed since last publish, dict as ordered set
 
         ini = 'definitions.ini'
         if os.path.isfile(ini):
@@ -113,6 +119,8 @@ class QtMqttApp(QAPP):
 
         self._mqttClient = client
         self._mqttConnected = False
+        self._mqttInflight = MqttInflight()  # mids published and not yet acknowledged
+        self._allDataTime = None  # time.monotonic() of the last full DATA sent
         if 'host' in self._config:
             self._mqttServerHost = self._config['host']
         if 'port' in self._config:
@@ -188,6 +196,7 @@ class QtMqttApp(QAPP):
     def _mqttOnConnect(self, client, userdata, flags, rc):
         if rc == 0:
             self._mqttConnected = True
+            self._mqttInflight.clear()
             # self._logger.debug("Connected to MQTT server with flags: ", flags) # flags is dict
             self._logger.info("Program connected to MQTT server")
             if self._mqttOutbox:
@@ -195,6 +204,7 @@ class QtMqttApp(QAPP):
                     message = "CONNECTED"
                     (result, mid) = self._mqttClient.publish(self._mqttOutbox, message, qos=MQTT_DEFAULT_QoS,
                                                              retain=True)
+                    self._mqttInflight.published(result, mid)
                     self._logger.info("{0} '{1}' (mid={2}) on {3}".format("Program sending message", message, mid,
                                                                           self._mqttOutbox))
                 except Exception as e:
@@ -272,6 +282,7 @@ class QtMqttApp(QAPP):
 
     # __________________________________________________________________
     def _mqttOnPublish(self, client, userdata, mid):
+        self._mqttInflight.acknowledged(mid)
         self._logger.debug("MQTT message is published : mid=%s userdata=%s", mid, userdata)
         self._logger.info("{0} (mid={1})".format("Message published", mid))
 
@@ -306,24 +317,27 @@ class QtMqttApp(QAPP):
     @pyqtSlot()
     def _publishAllData(self):
         if self._publishable:
-            all_data = []
-            for publishable in self._publishable:
-                all_data.append(str(publishable))
-            if all_data:
-                data = " ".join(all_data)
-                data = data.strip()
-                if data:
-                    self.sendData(data)
+            # PropData cache their fragment so the payload is a single join
+            data = " ".join([str(publishable) for publishable in self._publishable])
+            self._dirtyData.clear()
+            data = data.strip()
+            if data:
+                self.sendData(data)
+                if self._mqttConnected:
+                    self._allDataTime = time.monotonic()
 
     # __________________________________________________________________
     @pyqtSlot()
     def _publishDataChanges(self):
-        if self._publishable:
+        # only data marked by PropData.update() are visited
+        if self._dirtyData:
             changes = []
-            for publishable in self._publishable:
+            for publishable in list(self._dirtyData):
                 change = publishable.change()
                 if isinstance(change, str):
-                    changes.append(str(change))
+                    changes.append(change)
+                if not publishable.pending():
+                    del self._dirtyData[publishable]
             if changes:
                 data = " ".join(changes)
                 data = data.strip()
@@ -338,6 +352,7 @@ class QtMqttApp(QAPP):
         elif self._mqttConnected:
             try:
                 (result, mid) = self._mqttClient.publish(topic, message, qos=MQTT_DEFAULT_QoS, retain=False)
+                self._mqttInflight.published(result, mid)
                 self._logger.info(
                     "{0} '{1}' (mid={2}) on {3}".format("Program sending message", message, mid, topic))
             except Exception as e:
@@ -15,24 +15,27 @@ Props base class extends QtMqttApp:
     OVER -> notify that a challenge is over
     REQU -> request a command to another prop
     PROG -> request a control program
+
+Periodic actions are run by the PeriodicScheduler on single shot QTimer, with the
+same semantics as PropApp (see PeriodicActions.py), and the full DATA snapshot is
+spread over the props fleet the same way.
 """
 
 from constants import *
+from PeriodicActions import PeriodicActions
 from QtMqttApp import QtMqttApp
 
 from PyQt5.QtCore import pyqtSlot, QTimer
 
 
-class QtPropApp(QtMqttApp):
+class QtPropApp(QtMqttApp, PeriodicActions):
 
     # __________________________________________________________________
     def __init__(self, argv, client, debugging_mqtt=False):
         super().__init__(argv, client, debugging_mqtt)
 
-        self._periodicActions = {}
-        self._periodicTimers = []
-
-        self.addPeriodicAction("send all data", self.sendAllData, PUBLISHALLDATA_PERIOD)
+        self._initPeriodicActions()
+        self._addSendAllDataAction(PUBLISHALLDATA_PERIOD)
 
         QTimer.singleShot(0, self._startPeriodicTasks)
 
@@ -40,33 +43,23 @@ class QtPropApp(QtMqttApp):
     @pyqtSlot()
     def _startPeriodicTasks(self):
         # Periodic actions
-        for title, (func, time) in self._periodicActions.items():
-            try:
-                timer = QTimer()
-                self._periodicTimers.append(timer) # to keep a reference
-                timer.setInterval(time * 1000)
-                timer.timeout.connect(func)
-                QTimer.singleShot(0, timer.start)
-                self._logger.info("Periodic task created '{0}' every {1} seconds".format(title, time))
-            except Exception as e:
-                self._logger.error("Failed to create periodic task '{0}'".format(title))
-                self._logger.debug(e)
+        actions = [(title,) + action for title, action in self._periodicActions.items()]
+        self._startScheduler(lambda delay, callback: QTimer.singleShot(int(delay * 1000), callback), actions)
 
     # __________________________________________________________________
     def addData(self, data):
-        self._publishable.append(data)
+        self._publishable.add(data)
+        data.track(self._dirtyData)
 
     # __________________________________________________________________
-    def addPeriodicAction(self, title, func, time):
-        if title in self._periodicActions:
-            self._logger.warning("Duplicate periodic action ignored '{0}' every {1} seconds".format(title, time))
-        else:
-            self._periodicActions[title] = (func, time)
-            self._logger.info("New periodic action added '{0}' every {1} seconds".format(title, time))
+    def getData(self, name):
+        return self._publishable.get(name)
 
     # __________________________________________________________________
     def removeData(self, data):
         self._publishable.remove(data)
+        self._dirtyData.pop(data, None)
+        data.track(None)
 
     # __________________________________________________________________
     @pyqtSlot()
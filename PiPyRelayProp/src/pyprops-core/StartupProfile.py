@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+StartupProfile.py
+MIT License (c) Faure Systems <dev at faure dot systems>
+
+Startup phase timings printed when the props app is started with --profile-startup:
+    StartupProfile.begin(t0)     # perf_counter() at the top of main.py
+    StartupProfile.mark('config')
+Each phase is printed once, the first time it is marked.
+"""
+
+import sys
+import time
+
+_enabled = '--profile-startup' in sys.argv
+_start = time.perf_counter()
+_last = _start
+_phases = set()
+
+
+# __________________________________________________________________
+def begin(t0):
+    global _start, _last
+    _start = t0
+    _last = t0
+
+
+# __________________________________________________________________
+def enabled():
+    return _enabled
+
+
+# __________________________________________________________________
+def mark(phase):
+    global _last
+    if not _enabled or phase in _phases:
+        return
+    now = time.perf_counter()
+    _phases.add(phase)
+    print("Startup profile : {:<24} {:8.1f} ms  (+{:.1f} ms)".format(phase, (now - _start) * 1000,
+                                                                     (now - _last) * 1000))
+    _last = now
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+DataMessage.py
+MIT License (c) Faure Systems <dev at faure dot systems>
+
+DATA message tokenizer for 'DATA var1=value1 var2=value2 ...' where values may
+contain spaces (e.g. 'wiring-date=Sun Oct 18 16:33:37 2026'):
+- a str.split() pass when every word is a 'variable=value' pair
+- a single regex pass otherwise
+"""
+
+import re
+
+_reDataVariable = re.compile(r'(\S+)\s*=')
+
+
+# __________________________________________________________________
+def iterData(data):
+    """Yield (variable, value) pairs of a DATA payload without its 'DATA ' prefix."""
+    words = data.split()
+    if all(word[0] != '=' and '=' in word for word in words):
+        for word in words:
+            variable, _, value = word.rpartition('=')
+            yield variable, value
+        return
+
+    variable = None
+    start = 0
+    for m in _reDataVariable.finditer(data):
+        if variable is not None:
+            yield variable, data[start:m.start()].strip()
+        variable = m.group(1)
+        start = m.end()
+    if variable is not None:
+        yield variable, data[start:].strip()
+
+
+# __________________________________________________________________
+def parseData(message):
+    """Return the variables of a 'DATA ...' message as a dict."""
+    return dict(iterData(message[5:]))
@@ -5,10 +5,20 @@ PanelDialog.py
 MIT License (c) Faure Systems <dev at faure dot systems>
 
 Relay prop control panel dialog.
+
+With the binary_protocol option, switch and group commands are sent as
+compact binary frames (see RelayBinary.py), as text while the prop has another
+wiring than the one edited in WiringDialog.
+
+Prop variables changes come from the shared PropState (text and binary DATA) and
+are dispatched through a variable -> switches index, so only the switches of the
+changed variables are updated.
+
+Panel edits are reconciled with the existing widgets (see _buildPropWidgets()),
+without requesting the prop data again.
 """
 
 import os
-import re
 
 import paramiko
 import yaml
@@ -33,6 +43,7 @@ from AppletDialog import AppletDialog
 from LedWidget import LedWidget
 from PinGroupButton import PinGroupButton
 from PinSwitch import PinSwitch
+from RelayBinary import encodeCommand, encodeDataRequest
 
 from PyQt5.QtGui import QIcon
 from PyQt5.QtCore import Qt, pyqtSignal, pyqtSlot, QSize, QPoint, QTimer, QThread
@@ -41,20 +52,26 @@ from PyQt5.QtWidgets import QHBoxLayout, QVBoxLayout, QPushButton, QGroupBox, QD
 
 class PanelDialog(AppletDialog):
     aboutToClose = pyqtSignal()
-    propDataReveived = pyqtSignal(dict)
+    publishBinaryMessage = pyqtSignal(str, bytes)
     publishMessage = pyqtSignal(str, str)
     propChanged = pyqtSignal()
     resetBrokerConnection = pyqtSignal()
     switchLed = pyqtSignal(str, str)
 
     # __________________________________________________________________
-    def __init__(self, title, icon, admin_mode, prop_settings, wiring_dialog, layout_file, logger):
+    def __init__(self, title, icon, admin_mode, prop_settings, prop_state, wiring_dialog, layout_file, logger):
 
         # members required by _buildUi() must be set before calling super().__init__()
         self._adminMode = admin_mode
         self._propSettings = prop_settings
+        self._propState = prop_state
         self._wiringDialog = wiring_dialog
         self._groupBoxes = {}
+        self._groupButtons = {}  # group -> (PinGroupButton on, PinGroupButton off)
+        self._pinSwitches = {}  # prop variable -> (pin key, PinSwitch)
+        self._switches = {}  # variable -> [PinSwitch]
+        self._relaunchButton = None
+        self._rebootButton = None
         self._widgetGroups, self._widgetTitles, self._widgetVariables, \
         self._widgetImages, self._widgetButtons, \
         self._widgetHiddens, self._relaunchCommand, self._sshCredentials = PropPanel.loadPanelJson(logger)
@@ -78,13 +95,15 @@ class PanelDialog(AppletDialog):
 
         if os.path.isfile(local_json):
             self._propVariables = PropPanel.getVariablesJson(local_json, logger)
+            self._wiringPins = PropPanel.getWiringJson(local_json, logger)
         else:
             self._propVariables = {}
+            self._wiringPins = []
+        self._propState.setWiringPins(self._wiringPins)
 
         super().__init__(title, icon, layout_file, logger)
 
-        self._reDataSplitValues = re.compile(r'[^\s]+\s*=')
-        self._reDataVariables = re.compile(r'([^\s]+)\s*=')
+        self._propState.valueChanged.connect(self._updateSwitches)
 
         if 'options' in self._propSettings and 'always_on_top' in self._propSettings['options'] and \
                 self._propSettings['options']['always_on_top'] == '1':
@@ -98,38 +117,28 @@ class PanelDialog(AppletDialog):
     @pyqtSlot()
     def _buildPropWidgets(self):
 
-        for group in list(self._groupBoxes.keys()):
-            widgets = self._groupBoxes[group].findChildren(PinSwitch, '', options=Qt.FindChildrenRecursively)
-            for w in widgets:
-                try:
-                    self._groupBoxes[group].layout().removeWidget(w)
-                    w.deleteLater()
-                except Exception as e:
-                    print(e)
-            del (widgets)
-            self._mainLayout.removeWidget(self._groupBoxes[group])
-            self._groupBoxes[group].deleteLater()
-            del (self._groupBoxes[group])
-
-        for group in self._widgetGroups:
-            caption = group.capitalize() if group is not None else ''
-            variable = group + '/' if group is not None else ''
-            if variable in self._widgetTitles:
-                caption = self._widgetTitles[variable]
-            box = QGroupBox(caption)
-            box_layout = QVBoxLayout(box)
-            box_layout.setSpacing(12)
-            self._groupBoxes[group] = box
-            self._mainLayout.addWidget(box)
-            if group in self._widgetHiddens and self._widgetHiddens[group]:
-                box.setVisible(False)
+        # reconcile the widgets with the panel model: only the widgets that changed are created,
+        # moved or updated, switches of kept variables keep their state
+        topic = self._propSettings['prop']['prop_inbox']
+        relayout = False
+        missing_state = False
+
+        groups = list(self._widgetGroups)
+        group_variables = {group: [] for group in groups}
+        for v in self._propVariables:
+            group = v.split('/', 1)[0] if '/' in v else None
+            if group not in group_variables:
+                groups.append(group)
+                group_variables[group] = []
+            group_variables[group].append(v)
+
+        for v in list(self._pinSwitches.keys()):
+            if v not in self._propVariables:
+                self._pinSwitches.pop(v)[1].deleteLater()
+                relayout = True
 
         for v, pin in self._propVariables.items():
-            if '/' in v:
-                group, variable = v.split('/', 1)
-            else:
-                group = None
-                variable = v
+            variable = v.split('/', 1)[1] if '/' in v else v
             if v in self._widgetVariables:
                 label = self._widgetVariables[v]
             else:
@@ -138,6 +147,14 @@ class PanelDialog(AppletDialog):
                 image_on, image_off = SWITCH_IMAGES[self._widgetImages[v]]
             else:
                 image_on, image_off = SWITCH_IMAGES['default']
+            key = (pin.getVariable(), pin.getHigh(), pin.getLow(), pin.getOff(), pin.getOn(), topic)
+            if v in self._pinSwitches and self._pinSwitches[v][0] == key:
+                switch = self._pinSwitches[v][1]
+                switch.setLabel(label)
+                switch.setImages(image_on, image_off)
+                continue
+            if v in self._pinSwitches:
+                self._pinSwitches.pop(v)[1].deleteLater()
             switch = PinSwitch(label=label,
                                variable=pin.getVariable(),
                                image_on=image_on,
@@ -149,77 +166,108 @@ class PanelDialog(AppletDialog):
                                action_off=pin.getOn(),
                                value_on=pin.getHigh(),
                                value_off=pin.getLow(),
-                               topic=self._propSettings['prop']['prop_inbox'])
+                               topic=topic)
+            switch.publishMessage.connect(self.onCommandMessage)
+            for variable in switch.variables():
+                value = self._propState.value(variable)
+                if value is None:
+                    missing_state = True
+                else:
+                    switch.updateValue(variable, value)
+            self._pinSwitches[v] = (key, switch)
+            relayout = True
+
+        for group in list(self._groupBoxes.keys()):
+            if group != '__prop__' and group not in group_variables:
+                self._groupBoxes.pop(group).deleteLater()
+                self._groupButtons.pop(group, None)
+                relayout = True
+
+        for group in groups:
+            caption = group.capitalize() if group is not None else ''
+            variable = group + '/' if group is not None else ''
+            if variable in self._widgetTitles:
+                caption = self._widgetTitles[variable]
             if group in self._groupBoxes:
-                self._groupBoxes[group].layout().addWidget(switch)
+                box = self._groupBoxes[group]
+                box.setTitle(caption)
             else:
-                caption = group.capitalize() if group is not None else ''
                 box = QGroupBox(caption)
                 box_layout = QVBoxLayout(box)
                 box_layout.setSpacing(12)
                 self._groupBoxes[group] = box
-                self._mainLayout.addWidget(box)
-                box_layout.addWidget(switch)
-            switch.publishMessage.connect(self.publishMessage)
-            self.propDataReveived.connect(switch.onDataReceived)
-            if v in self._widgetHiddens and self._widgetHiddens[v]:
-                switch.setVisible(False)
-
-        for group in list(self._groupBoxes.keys()):
-            if group is None: continue
-            button_on = PinGroupButton(group, GPIO_HIGH, self._propSettings['prop']['prop_inbox'])
-            self._groupBoxes[group].layout().addWidget(button_on)
-
-            button_off = PinGroupButton(group, GPIO_LOW, self._propSettings['prop']['prop_inbox'])
-            self._groupBoxes[group].layout().addWidget(button_off)
-
-            v_high = '{}/*:{}'.format(group, str(GPIO_HIGH))
-            v_low = '{}/*:{}'.format(group, str(GPIO_LOW))
-
-            if v_high in self._widgetButtons:
-                button_on.setCaption(self._widgetButtons[v_high])
-            if v_low in self._widgetButtons:
-                button_off.setCaption(self._widgetButtons[v_low])
+                relayout = True
+
+            widgets = [self._pinSwitches[v][1] for v in group_variables[group]]
+            if group is not None:
+                if group not in self._groupButtons:
+                    button_on = PinGroupButton(group, GPIO_HIGH, topic)
+                    button_off = PinGroupButton(group, GPIO_LOW, topic)
+                    button_on.publishMessage.connect(self.onCommandMessage)
+                    button_off.publishMessage.connect(self.onCommandMessage)
+                    self._groupButtons[group] = (button_on, button_off)
+                button_on, button_off = self._groupButtons[group]
+                widgets.append(button_on)
+                widgets.append(button_off)
+            relayout = self._placeWidgets(box.layout(), widgets) or relayout
+
+        if '__prop__' not in self._groupBoxes:
+            box = QGroupBox()
+            box_layout = QVBoxLayout(box)
+            box_layout.setSpacing(12)
+            self._groupBoxes['__prop__'] = box
 
-            if v_high in self._widgetHiddens and self._widgetHiddens[v_high]:
-                button_on.setVisible(False)
-            if v_low in self._widgetHiddens and self._widgetHiddens[v_low]:
-                button_off.setVisible(False)
+            self._relaunchButton = QPushButton(self.tr("Relaunch"))
+            self._rebootButton = QPushButton(self.tr("Reboot"))
+            box_layout.addWidget(self._relaunchButton)
+            box_layout.addWidget(self._rebootButton)
 
-            button_on.publishMessage.connect(self.publishMessage)
-            button_off.publishMessage.connect(self.publishMessage)
+            self._relaunchButton.released.connect(self.relaunchProp)
+            self._rebootButton.released.connect(self.rebootProp)
 
         board = self._propSettings['prop']['prop_name'] if 'prop_name' in self._propSettings['prop'] else self.tr(
             "Prop")
-
-        box = QGroupBox(board)
-        box_layout = QVBoxLayout(box)
-        box_layout.setSpacing(12)
-        self._groupBoxes['__prop__'] = box
-        self._mainLayout.addWidget(box)
-
-        button_relaunch = QPushButton(self.tr("Relaunch"))
-        self._groupBoxes['__prop__'].layout().addWidget(button_relaunch)
-
-        button_reboot = QPushButton(self.tr("Reboot"))
-        self._groupBoxes['__prop__'].layout().addWidget(button_reboot)
-
-        box_layout.addWidget(button_relaunch)
-        box_layout.addWidget(button_reboot)
-
-        if '__RELAUNCH__' in self._widgetHiddens and self._widgetHiddens['__RELAUNCH__']:
-            button_relaunch.setVisible(False)
-        if '__REBOOT__' in self._widgetHiddens and self._widgetHiddens['__REBOOT__']:
-            button_reboot.setVisible(False)
-
-        if self._propSettings['prop']['board'] == 'nucleo':
-            box.setVisible(False)
-
-        button_relaunch.released.connect(self.relaunchProp)
-        button_reboot.released.connect(self.rebootProp)
-
-        self.publishMessage.emit(self._propSettings['prop']['prop_inbox'], 'app:data')
-        QTimer.singleShot(0, self.onRebuild)
+        self._groupBoxes['__prop__'].setTitle(board)
+
+        # group boxes are after the header layout and the stretch
+        boxes = [self._groupBoxes[group] for group in groups] + [self._groupBoxes['__prop__']]
+        relayout = self._placeWidgets(self._mainLayout, boxes, 2) or relayout
+
+        # visibility once the widgets are in their parent
+        hiddens = []
+        for group in groups:
+            hiddens.append((self._groupBoxes[group], group in self._widgetHiddens and self._widgetHiddens[group]))
+            if group in self._groupButtons:
+                v_high = '{}/*:{}'.format(group, str(GPIO_HIGH))
+                v_low = '{}/*:{}'.format(group, str(GPIO_LOW))
+                button_on, button_off = self._groupButtons[group]
+                button_on.setCaption(self._widgetButtons[v_high] if v_high in self._widgetButtons
+                                     else button_on.defaultCaption())
+                button_off.setCaption(self._widgetButtons[v_low] if v_low in self._widgetButtons
+                                      else button_off.defaultCaption())
+                hiddens.append((button_on, v_high in self._widgetHiddens and self._widgetHiddens[v_high]))
+                hiddens.append((button_off, v_low in self._widgetHiddens and self._widgetHiddens[v_low]))
+        for v, (key, switch) in self._pinSwitches.items():
+            hiddens.append((switch, v in self._widgetHiddens and self._widgetHiddens[v]))
+        hiddens.append((self._relaunchButton, '__RELAUNCH__' in self._widgetHiddens and
+                        self._widgetHiddens['__RELAUNCH__']))
+        hiddens.append((self._rebootButton, '__REBOOT__' in self._widgetHiddens and self._widgetHiddens['__REBOOT__']))
+        hiddens.append((self._groupBoxes['__prop__'], self._propSettings['prop']['board'] == 'nucleo'))
+        for widget, hidden in hiddens:
+            if widget.isHidden() != bool(hidden):
+                widget.setHidden(bool(hidden))
+                relayout = True
+
+        self._switches = {}
+        for key, switch in self._pinSwitches.values():
+            for variable in switch.variables():
+                self._switches.setdefault(variable, []).append(switch)
+
+        # states of kept switches are already known, the prop is asked only for new variables
+        if missing_state:
+            self._requestPropData()
+        if relayout:
+            QTimer.singleShot(0, self.onRebuild)
 
     # __________________________________________________________________
     def _buildUi(self):
@@ -291,29 +339,79 @@ class PanelDialog(AppletDialog):
             self.resize(QSize(layout['w'], layout['h']))
 
     # __________________________________________________________________
-    def _parsePropData(self, message):
+    def _binaryProtocol(self):
 
-        variables = {}
-        data = message[5:]
-        vars = re.split(self._reDataSplitValues, data)[1:]
+        return 'options' in self._propSettings and 'binary_protocol' in self._propSettings['options'] and \
+               self._propSettings['options']['binary_protocol'] == '1'
 
-        try:
-            m = re.findall(self._reDataVariables, data)
-            if m:
-                i = 0
-                for var in m:
-                    variables[var] = vars[i].strip()
-                    i = i + 1
-        except Exception as e:
-            self._logger.debug(e)
+    # __________________________________________________________________
+    def _binaryCommand(self, message):
+
+        # 'variable:1' or 'group/*:0' as a binary frame, None if it can't be encoded
+        if not self._propState.sameWiring():
+            # pin indexes of a wiring not uploaded yet would switch other relays
+            return None
+        predicate, _, action = message.rpartition(':')
+        if action not in ('0', '1') or not predicate:
+            return None
+        if predicate.endswith('/*'):
+            prefix = predicate[:-1]
+            indexes = [i for i, pin in enumerate(self._wiringPins)
+                       if pin is not None and pin.getVariable().startswith(prefix)]
+        else:
+            indexes = [i for i, pin in enumerate(self._wiringPins)
+                       if pin is not None and pin.getVariable() == predicate]
+        if not indexes:
+            return None
+        return encodeCommand(indexes, int(action), self._propState.wiringTag())
+
+    # __________________________________________________________________
+    def _placeWidgets(self, layout, widgets, start=0):
+
+        # returns True if the layout had to be changed
+        current = [layout.itemAt(i).widget() for i in range(start, layout.count())]
+        if current == widgets:
+            return False
+        for w in current:
+            layout.removeWidget(w)
+        for w in widgets:
+            layout.addWidget(w)
+        return True
+
+    # __________________________________________________________________
+    def _requestPropData(self):
 
-        self.propDataReveived.emit(variables)
+        if self._binaryProtocol():
+            self.publishBinaryMessage.emit(self._propSettings['prop']['prop_inbox'] + MQTT_BINARY_SUFFIX,
+                                           encodeDataRequest())
+        else:
+            self.publishMessage.emit(self._propSettings['prop']['prop_inbox'], 'app:data')
+
+    # __________________________________________________________________
+    @pyqtSlot(str, str)
+    def _updateSwitches(self, variable, value):
+
+        switches = self._switches.get(variable)
+        if switches:
+            for switch in switches:
+                switch.updateValue(variable, value)
 
     # __________________________________________________________________
     def closeEvent(self, e):
 
         self.aboutToClose.emit()
 
+    # __________________________________________________________________
+    @pyqtSlot(str, str)
+    def onCommandMessage(self, topic, message):
+
+        if self._binaryProtocol():
+            payload = self._binaryCommand(message)
+            if payload is not None:
+                self.publishBinaryMessage.emit(topic + MQTT_BINARY_SUFFIX, payload)
+                return
+        self.publishMessage.emit(topic, message)
+
     # __________________________________________________________________
     @pyqtSlot()
     def onConnectedToMqttBroker(self):
@@ -330,7 +428,7 @@ class PanelDialog(AppletDialog):
             else:
                 self._led.switchOn('yellow')
 
-        self.publishMessage.emit(self._propSettings['prop']['prop_inbox'], 'app:data')
+        self._requestPropData()
 
     # __________________________________________________________________
     @pyqtSlot()
@@ -374,10 +472,6 @@ class PanelDialog(AppletDialog):
                 else:
                     self._led.switchOn('green')
 
-        if 'prop_outbox' in self._propSettings['prop']:
-            if topic == self._propSettings['prop']['prop_outbox'] and message.startswith('DATA '):
-                self._parsePropData(message)
-
     # __________________________________________________________________
     @pyqtSlot()
     def onPanelEdition(self):
@@ -443,6 +537,15 @@ class PanelDialog(AppletDialog):
     def onRebuild(self):
         self.resize(self.width(), 50)
 
+    # __________________________________________________________________
+    @pyqtSlot(list)
+    def onWiringChanged(self, pins):
+
+        # binary frame indexes follow the wiring edited, saved or uploaded in WiringDialog, binary
+        # commands are sent once the prop has it (see PropState.sameWiring())
+        self._wiringPins = pins
+        self._propState.setWiringPins(pins)
+
     # __________________________________________________________________
     @pyqtSlot()
     def onWiringButtonReleased(self):
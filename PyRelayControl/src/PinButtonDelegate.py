@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+PinButtonDelegate.py
+MIT License (c) Faure Systems <dev at faure dot systems>
+
+Item delegate drawing the Output cell of the wiring table as a push button,
+no widget is created per pin. A click on the cell emits pinClicked(index).
+"""
+
+from PyQt5.QtCore import Qt, QEvent, QModelIndex, QSize, pyqtSignal
+from PyQt5.QtWidgets import QApplication, QStyle, QStyleOptionButton, QStyledItemDelegate
+
+
+class PinButtonDelegate(QStyledItemDelegate):
+    pinClicked = pyqtSignal(QModelIndex)
+
+    # __________________________________________________________________
+    def __init__(self, parent=None):
+
+        super().__init__(parent)
+
+        self._pressed = None  # (row, column) of the cell the mouse button was pressed on
+
+    # __________________________________________________________________
+    def _buttonOption(self, option, index):
+
+        button = QStyleOptionButton()
+        button.rect = option.rect.adjusted(2, 2, -2, -2)
+        button.text = " {} ".format(index.data())
+        button.state = option.state | QStyle.State_Enabled | QStyle.State_Raised
+        return button
+
+    # __________________________________________________________________
+    def editorEvent(self, event, model, option, index):
+
+        if event.type() == QEvent.MouseButtonPress and event.button() == Qt.LeftButton:
+            self._pressed = (index.row(), index.column())
+            return True
+
+        if event.type() == QEvent.MouseButtonRelease and event.button() == Qt.LeftButton:
+            pressed = self._pressed == (index.row(), index.column())
+            self._pressed = None
+            if pressed and option.rect.contains(event.pos()):
+                self.pinClicked.emit(index)
+            return True
+
+        return super().editorEvent(event, model, option, index)
+
+    # __________________________________________________________________
+    def paint(self, painter, option, index):
+
+        style = option.widget.style() if option.widget else QApplication.style()
+        style.drawControl(QStyle.CE_PushButton, self._buttonOption(option, index), painter, option.widget)
+
+    # __________________________________________________________________
+    def sizeHint(self, option, index):
+
+        style = option.widget.style() if option.widget else QApplication.style()
+        button = self._buttonOption(option, index)
+        text_size = option.fontMetrics.size(Qt.TextSingleLine, button.text)
+        size = style.sizeFromContents(QStyle.CT_PushButton, button, text_size, option.widget)
+        return size + QSize(4, 4)
@@ -21,3 +21,10 @@ class PinGroupButton(PushButton):
 
         super(PinGroupButton, self).__init__(caption, action, topic)
 
+        self._defaultCaption = caption
+
+    # __________________________________________________________________
+    def defaultCaption(self):
+
+        return self._defaultCaption
+
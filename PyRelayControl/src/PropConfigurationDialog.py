@@ -132,6 +132,9 @@ class PropConfigurationDialog(QDialog):
         self._connectionStatusHiddenButton = QCheckBox(self.tr("Hide connection status"))
         options_box_layout.addWidget(self._connectionStatusHiddenButton)
 
+        self._binaryProtocolButton = QCheckBox(self.tr("Compact binary protocol (Raspberry Pi prop)"))
+        options_box_layout.addWidget(self._binaryProtocolButton)
+
         admin_layout = QHBoxLayout()
         options_box_layout.addLayout(admin_layout)
 
@@ -253,6 +256,10 @@ class PropConfigurationDialog(QDialog):
                 self._connectionStatusHiddenButton.setChecked(True)
             else:
                 self._connectionStatusHiddenButton.setChecked(False)
+            if 'binary_protocol' in prop_settings['options'] and prop_settings['options']['binary_protocol'] == '1':
+                self._binaryProtocolButton.setChecked(True)
+            else:
+                self._binaryProtocolButton.setChecked(False)
             if 'admin_password' in prop_settings['options']:
                 if len(self._propSettings['options']['admin_password']):
                     r = list(map(lambda x: chr(256 - int(x)), bytearray.fromhex(self._propSettings['options']['admin_password'])))
@@ -342,6 +349,11 @@ class PropConfigurationDialog(QDialog):
         else:
             self._propSettings['options']['connection_status'] = '1'
 
+        if self._binaryProtocolButton.isChecked() and self._boardPiButton.isChecked():
+            self._propSettings['options']['binary_protocol'] = '1'
+        else:
+            self._propSettings['options']['binary_protocol'] = '0'
+
         password = self._adminPasswordInput.text().strip()
         if self._adminPasswordInput.text().strip():
             r = list(map(lambda x: hex(256 - x)[2:], password.encode('utf-8')))
@@ -24,14 +24,12 @@ class PropPanel:
                 with open(file, 'r', encoding='utf-8') as fp:
                     json_list = json.load(fp)
                 for p in json_list:
-                    try:
-                        key = p['pin']
-                        if key is not None:
-                            prop_variables[p['variable']] = PropPin(key, p['variable'], p['initial'], p['alias'])
-                            logger.info("Variable loaded from JSON file : {}".format(p))
-                    except Exception as e:
+                    pin = PropPin.fromJson(p)
+                    if pin is None:
                         logger.warning("Failed load variable from JSON file : {}".format(p))
-                        logger.warning(e)
+                    elif not pin.isNull():
+                        prop_variables[pin.getVariable()] = pin
+                        logger.info("Variable loaded from JSON file : {}".format(p))
             except json.JSONDecodeError as jex:
                 logger.error("JSONDecodeError '{}' at {} in: {}".format(jex.msg, jex.pos, jex.doc))
             except Exception as e:
@@ -39,6 +37,30 @@ class PropPanel:
                 logger.debug(e)
         return prop_variables
 
+    # __________________________________________________________________
+    @classmethod
+    def getWiringJson(self, file, logger):
+
+        # PropPin in wiring order (binary protocol pin indexes), None for a null pin
+        prop_pins = []
+        if os.path.isfile(file):
+            try:
+                with open(file, 'r', encoding='utf-8') as fp:
+                    json_list = json.load(fp)
+                for p in json_list:
+                    pin = PropPin.fromJson(p)
+                    if pin is None:
+                        logger.warning("Failed load pin from JSON file : {}".format(p))
+                    elif pin.isNull():
+                        pin = None
+                    prop_pins.append(pin)
+            except json.JSONDecodeError as jex:
+                logger.error("JSONDecodeError '{}' at {} in: {}".format(jex.msg, jex.pos, jex.doc))
+            except Exception as e:
+                logger.error("Failed to load JSON file '{0}'".format(file))
+                logger.debug(e)
+        return prop_pins
+
     # __________________________________________________________________
     @classmethod
     def loadPanelJson(self, logger):
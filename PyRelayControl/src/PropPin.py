@@ -5,21 +5,24 @@ PropPin.py
 MIT License (c) Faure Systems <dev at faure dot systems>
 
 Class to represent a prop pin.
+
+PropPin is a slotted record, replace() returns a modified copy. Pins share
+the class logger set with PropPin.logger.
 """
 from constants import *
 
 
 class PropPin:
+    __slots__ = ('_pin', '_variable', '_initial', '_alias')
 
-    # __________________________________________________________________
-    def __init__(self, pin=None, variable='', initial=GPIO_LOW, alias=("1", "0"), logger=None):
-        super().__init__()
+    logger = None  # shared by all pins
 
-        self._logger = logger
+    # __________________________________________________________________
+    def __init__(self, pin=None, variable='', initial=GPIO_LOW, alias=("1", "0")):
         self._pin = pin
         self._variable = variable
         self._initial = initial
-        self._alias = alias
+        self._alias = tuple(alias)
 
     # __________________________________________________________________
     def __str__(self):
@@ -27,6 +30,20 @@ class PropPin:
                                                                      self._variable, self._initial,
                                                                      self._alias[0], self._alias[1])
 
+    # __________________________________________________________________
+    @classmethod
+    def fromJson(cls, p, pin=None):
+        # p is a wiring JSON entry, pin overrides p['pin'], returns None if p is invalid
+        try:
+            if pin is None:
+                pin = p['pin']
+            return cls(pin, p['variable'], p['initial'], p['alias'])
+        except Exception as e:
+            if cls.logger:
+                cls.logger.warning("Invalid pin in wiring : {}".format(p))
+                cls.logger.debug(e)
+            return None
+
     # __________________________________________________________________
     def getAlias(self):
         return self._alias
@@ -35,7 +52,6 @@ class PropPin:
     def getInitial(self):
         return self._initial
 
-
     # __________________________________________________________________
     def getLabel(self):
         return self._variable
@@ -69,28 +85,16 @@ class PropPin:
         return self._pin is None
 
     # __________________________________________________________________
-    def setAlias(self, t, f):
-        self._alias = (t, f)
-
-    # __________________________________________________________________
-    def setInitial(self, v):
-        self._initial = v
-
-    # __________________________________________________________________
-    def setPin(self, v):
-        self._pin = v
-
-    # __________________________________________________________________
-    def setVariable(self, v):
-        self._variable = v
+    def replace(self, pin=None, variable=None, initial=None, alias=None):
+        return PropPin(self._pin if pin is None else pin,
+                       self._variable if variable is None else variable,
+                       self._initial if initial is None else initial,
+                       self._alias if alias is None else alias)
 
     # __________________________________________________________________
-    def toJson(self):
+    def toDict(self):
+        # wiring JSON entry, None (null) for a null pin
         if self._pin is None:
-            return "null"
+            return None
 
-        return "{" + "'pin': '{}', 'variable': '{}', initial: '{}', 'alias': ['{}', '{}']".format(self._pin,
-                                                                                                  self._variable,
-                                                                                                  self._initial,
-                                                                                                  self._alias[0],
-                                                                                                  self._alias[1]) + "}"
+        return {'pin': self._pin, 'variable': self._variable, 'initial': self._initial, 'alias': list(self._alias)}
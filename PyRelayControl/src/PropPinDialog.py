@@ -198,13 +198,10 @@ class PropPinDialog(QDialog):
                     self._propPins.pop(self._key)
                 except:
                     pass  # sometimes it has already been removed (but I don't know why)
-            self._pin.setPin(pin)
-            self._pin.setVariable(variable)
-            self._pin.setInitial(initial)
-            self._pin.setAlias(t, f)
+            self._pin = self._pin.replace(pin=pin, variable=variable, initial=initial, alias=(t, f))
             self.accept()
         else:
-            self._pin.setPin(pin)
+            self._pin = self._pin.replace(pin=pin)
             self.done(-1)
 
     # __________________________________________________________________
@@ -212,5 +209,11 @@ class PropPinDialog(QDialog):
     def onDelete(self):
 
         pin = self._pinSelection.currentText()
-        self._pin.setPin(pin)
+        self._pin = self._pin.replace(pin=pin)
         self.done(-1)
+
+    # __________________________________________________________________
+    def getPropPin(self):
+
+        # PropPin is immutable, the dialog result is a new pin
+        return self._pin
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+PropState.py
+MIT License (c) Faure Systems <dev at faure dot systems>
+
+Latest values of the prop variables, shared by PanelDialog and WiringDialog:
+- each outbox DATA message is parsed once (see DataMessage.py)
+- binary DATA frames are decoded with the wiring pins given by setWiringPins(),
+  only if the prop tags them with the same wiring (see RelayBinary.py), sameWiring()
+  tells if binary commands can be sent with these pins
+- only values that differ from the cached state are notified, with valueChanged
+  per variable and dataChanged per message
+
+Relay states come with binary DATA frames once negotiated (binary_protocol option),
+text DATA messages (app:data replies, props without binary protocol) are always
+applied too.
+"""
+
+from constants import *
+from DataMessage import iterData
+from RelayBinary import decodeData, wiringTag
+
+from PyQt5.QtCore import QObject, pyqtSignal, pyqtSlot
+
+
+class PropState(QObject):
+    dataChanged = pyqtSignal(dict)
+    valueChanged = pyqtSignal(str, str)
+
+    # __________________________________________________________________
+    def __init__(self, prop_settings, logger):
+
+        super().__init__()
+
+        self._propSettings = prop_settings
+        self._logger = logger
+        self._values = {}
+        self._wiringPins = []
+        self._wiringTag = wiringTag([])
+        self._propWiringTag = None  # tag of the last binary DATA frame
+
+    # __________________________________________________________________
+    def _update(self, pairs):
+
+        changes = {}
+        values = self._values
+        for variable, value in pairs:
+            if values.get(variable) != value:
+                values[variable] = value
+                changes[variable] = value
+                self.valueChanged.emit(variable, value)
+        if changes:
+            self.dataChanged.emit(changes)
+
+    # __________________________________________________________________
+    @pyqtSlot(str, bytes)
+    def onBinaryMessageReceived(self, topic, payload):
+
+        if 'prop_outbox' not in self._propSettings['prop'] or \
+                topic != self._propSettings['prop']['prop_outbox'] + MQTT_BINARY_SUFFIX:
+            return
+
+        data = decodeData(payload)
+        if data is None:
+            self._logger.warning("Binary DATA frame unknown : {}".format(payload.hex()))
+            return
+        self._propWiringTag = data.tag
+        if data.tag != self._wiringTag:
+            # text DATA still come, and commands are sent as text until the wiring is uploaded
+            self._logger.warning("Binary DATA frame ignored, the prop has another wiring")
+            return
+        self._update((pin.getVariable(), pin.getHigh() if level else pin.getLow())
+                     for pin, level in zip(self._wiringPins, data.levels) if pin is not None)
+
+    # __________________________________________________________________
+    @pyqtSlot(str, str)
+    def onMessageReceived(self, topic, message):
+
+        if 'prop_outbox' in self._propSettings['prop']:
+            if topic == self._propSettings['prop']['prop_outbox'] and message.startswith('DATA '):
+                self._update(iterData(message[5:]))
+
+    # __________________________________________________________________
+    def sameWiring(self):
+
+        # True if the prop has tagged its last binary DATA frame with the wiring pins
+        return self._propWiringTag == self._wiringTag
+
+    # __________________________________________________________________
+    def setWiringPins(self, pins):
+
+        # PropPin (or None) by binary frame index, updated on WiringDialog.wiringChanged
+        self._wiringPins = pins
+        self._wiringTag = wiringTag(None if pin is None else pin.getVariable() for pin in pins)
+
+    # __________________________________________________________________
+    def value(self, variable):
+
+        return self._values.get(variable)
+
+    # __________________________________________________________________
+    def values(self):
+
+        return self._values
+
+    # __________________________________________________________________
+    def wiringTag(self):
+
+        # tag of the wiring pins, for binary commands
+        return self._wiringTag
@@ -5,12 +5,18 @@ RelayApplet.py
 MIT License (c) Faure Systems <dev at faure dot systems>
 
 RelayApplet application extends MqttApplet.
+
+Prop outbox messages are parsed once in a PropState shared by the dialogs.
 """
 
 from constants import *
 from MqttApplet import MqttApplet
+import PixmapCache
 from PanelDialog import PanelDialog
 from PropConfigurationDialog import PropConfigurationDialog
+from PropPin import PropPin
+from PropState import PropState
+from SwitchWidget import IMAGE_SIZE, BUTTON_SIZE, BUTTON_ON, BUTTON_OFF
 from WiringDialog import WiringDialog
 from PyQt5.QtCore import pyqtSlot
 import os, sys
@@ -27,6 +33,12 @@ class RelayApplet(MqttApplet):
 
         self.setApplicationDisplayName(APPDISPLAYNAME)
 
+        PropPin.logger = self._logger
+
+        # switch images rendered once for all the panel widgets
+        PixmapCache.preload([image for images in SWITCH_IMAGES.values() for image in images], IMAGE_SIZE)
+        PixmapCache.preload([BUTTON_ON, BUTTON_OFF], BUTTON_SIZE)
+
         self._adminMode = MutableInt(1)
         self._propSettings = configparser.ConfigParser()
         prop_ini = 'prop.ini'
@@ -62,9 +74,15 @@ class RelayApplet(MqttApplet):
 
         if 'prop_outbox' in self._propSettings['prop']:
             self._mqttSubscriptions.append(self._propSettings['prop']['prop_outbox'])
+            if self._binaryProtocol():
+                self._mqttBinarySubscriptions.append(self._propSettings['prop']['prop_outbox'] + MQTT_BINARY_SUFFIX)
+
+        self._propState = PropState(self._propSettings, self._logger)
+        self.messageReceived.connect(self._propState.onMessageReceived)
+        self.binaryMessageReceived.connect(self._propState.onBinaryMessageReceived)
 
         self._wiringDialog = WiringDialog(self.tr("Wiring configuration"), './x-settings.png',
-                                        self._propSettings, WIRING_LAYOUT_FILE,
+                                        self._propSettings, self._propState, WIRING_LAYOUT_FILE,
                                         self._logger)
         self._wiringDialog.publishMessage.connect(self.publishMessage)
         self._wiringDialog.publishRetainedMessage.connect(self.onPublishRetainedMessage)
@@ -74,12 +92,14 @@ class RelayApplet(MqttApplet):
         self.messageReceived.connect(self._wiringDialog.onMessageReceived)
 
         self._panelDialog = PanelDialog(self.tr("Control panel"), './x-relay.png',
-                                        self._adminMode, self._propSettings, self._wiringDialog,
+                                        self._adminMode, self._propSettings, self._propState, self._wiringDialog,
                                         LAYOUT_FILE, self._logger)
         self._panelDialog.aboutToClose.connect(self.exitOnClose)
         self._panelDialog.publishMessage.connect(self.publishMessage)
+        self._panelDialog.publishBinaryMessage.connect(self.publishBinaryMessage)
         self._panelDialog.resetBrokerConnection.connect(self.onResetBrokerConnection)
         self._panelDialog.propChanged.connect(self._wiringDialog.onPropChanged)
+        self._wiringDialog.wiringChanged.connect(self._panelDialog.onWiringChanged)
 
         self.connectedToMqttBroker.connect(self._panelDialog.onConnectedToMqttBroker)
         self.disconnectedToMqttBroker.connect(self._panelDialog.onDisconnectedToMqttBroker)
@@ -87,6 +107,12 @@ class RelayApplet(MqttApplet):
 
         self._panelDialog.show()
 
+    # __________________________________________________________________
+    def _binaryProtocol(self):
+
+        return 'options' in self._propSettings and 'binary_protocol' in self._propSettings['options'] and \
+               self._propSettings['options']['binary_protocol'] == '1'
+
     # __________________________________________________________________
     @pyqtSlot()
     def exitOnClose(self):
@@ -114,8 +140,11 @@ class RelayApplet(MqttApplet):
     def onResetBrokerConnection(self):
 
         self._mqttSubscriptions = []
+        self._mqttBinarySubscriptions = []
         if 'prop_outbox' in self._propSettings['prop']:
             self._mqttSubscriptions.append(self._propSettings['prop']['prop_outbox'])
+            if self._binaryProtocol():
+                self._mqttBinarySubscriptions.append(self._propSettings['prop']['prop_outbox'] + MQTT_BINARY_SUFFIX)
 
         broker_changed = False
         if 'broker_address' in self._propSettings['prop']:
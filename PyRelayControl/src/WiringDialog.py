@@ -6,6 +6,9 @@ MIT License (c) Faure Systems <dev at faure dot systems>
 
 Dialog to edit Relay prop wiring.
 
+The wiring is displayed by a QTableView on WiringModel, the Output buttons are
+drawn by PinButtonDelegate, so a pin edit only refreshes its row.
+
 Starting with Python 3.7, the regular dict became order preserving,
 so it is no longer necessary to specify collections.OrderedDict for
 JSON generation and parsing.
@@ -13,7 +16,6 @@ JSON generation and parsing.
 
 import json
 import os
-import re
 import yaml
 
 from collections import OrderedDict  # remember the order entries are added
@@ -21,15 +23,17 @@ from collections import OrderedDict  # remember the order entries are added
 from constants import *
 from AppletDialog import AppletDialog
 from LedWidget import LedWidget
+from PinButtonDelegate import PinButtonDelegate
 from PropPin import PropPin
 from PropPinDialog import PropPinDialog
+from WiringModel import WiringModel, COLUMN_OUTPUT, COLUMN_VARIABLE
 
-from PyQt5.QtCore import Qt, pyqtSignal, pyqtSlot, QSize, QPoint
+from PyQt5.QtCore import Qt, pyqtSignal, pyqtSlot, QSize, QPoint, QModelIndex
 from PyQt5.QtGui import QIcon, QTextDocument
 from PyQt5.QtPrintSupport import QPrinter, QPrintDialog
-from PyQt5.QtWidgets import QHBoxLayout, QVBoxLayout, QGridLayout
-from PyQt5.QtWidgets import QPushButton, QLabel, QDialog, QWidget
-from PyQt5.QtWidgets import QSizePolicy, QScrollArea, QMessageBox
+from PyQt5.QtWidgets import QHBoxLayout, QVBoxLayout
+from PyQt5.QtWidgets import QPushButton, QLabel, QDialog
+from PyQt5.QtWidgets import QSizePolicy, QMessageBox, QTableView, QAbstractItemView, QHeaderView
 
 
 class WiringDialog(AppletDialog):
@@ -38,14 +42,16 @@ class WiringDialog(AppletDialog):
     publishRetainedMessage = pyqtSignal(str, str)
     reloadPropPinsDisplay = pyqtSignal()
     switchLed = pyqtSignal(str, str)
+    wiringChanged = pyqtSignal(list)
 
     # __________________________________________________________________
-    def __init__(self, title, icon, prop_settings, layout_file, logger):
+    def __init__(self, title, icon, prop_settings, prop_state, layout_file, logger):
 
         # members required by _buildUi() must be set before calling super().__init__()
         self._logger = logger
         self._localFile = ''
         self._propSettings = prop_settings
+        self._propState = prop_state
         self._propPins = {}
 
         self._boardMegaPins = []
@@ -106,8 +112,7 @@ class WiringDialog(AppletDialog):
 
         super().__init__(title, icon, layout_file, logger)
 
-        self._reDataSplitValues = re.compile(r'[^\s]+\s*=')
-        self._reDataVariables = re.compile(r'([^\s]+)\s*=')
+        self._propState.dataChanged.connect(self.propDataReveived)
 
         self.setWindowFlags(self.windowFlags() & ~Qt.WindowContextHelpButtonHint)
 
@@ -142,17 +147,30 @@ class WiringDialog(AppletDialog):
         header_layout.addWidget(self._led)
         main_layout.addLayout(header_layout)
 
-        self._pinsDisplayWidget = QWidget()
-        self._pinsGridLayout = QGridLayout(self._pinsDisplayWidget)
-
-        scrollArea = QScrollArea()
-        scrollArea.setObjectName('ScrollingArea')
-        scrollArea.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOn)
-        scrollArea.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
-        scrollArea.setWidgetResizable(True)
-        scrollArea.setWidget(self._pinsDisplayWidget)
-        scrollArea.setStyleSheet("#ScrollingArea { border: 1px solid #CCCCCC }")
-        main_layout.addWidget(scrollArea)
+        self._pinsModel = WiringModel(self)
+        self._pinButtonDelegate = PinButtonDelegate(self)
+
+        self._pinsView = QTableView()
+        self._pinsView.setObjectName('ScrollingArea')
+        self._pinsView.setModel(self._pinsModel)
+        self._pinsView.setItemDelegateForColumn(COLUMN_OUTPUT, self._pinButtonDelegate)
+        self._pinsView.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOn)
+        self._pinsView.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self._pinsView.setSelectionMode(QAbstractItemView.NoSelection)
+        self._pinsView.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self._pinsView.setFocusPolicy(Qt.NoFocus)
+        self._pinsView.setShowGrid(False)
+        self._pinsView.setWordWrap(False)
+        self._pinsView.verticalHeader().setVisible(False)
+        self._pinsView.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self._pinsView.verticalHeader().setDefaultSectionSize(
+            self._pinButtonDelegate.sizeHint(self._pinsView.viewOptions(), QModelIndex()).height())
+        self._pinsView.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        self._pinsView.horizontalHeader().setResizeContentsPrecision(0)  # visible rows only
+        self._pinsView.horizontalHeader().setSectionResizeMode(COLUMN_VARIABLE, QHeaderView.Stretch)
+        self._pinsView.horizontalHeader().setHighlightSections(False)
+        self._pinsView.setStyleSheet("#ScrollingArea { border: 1px solid #CCCCCC }")
+        main_layout.addWidget(self._pinsView)
 
         self._localFileDisplay = QLabel(self._localFile)
 
@@ -202,30 +220,12 @@ class WiringDialog(AppletDialog):
 
         self.switchLed.connect(self._led.switchOn)
         self.reloadPropPinsDisplay.connect(self.onReloadPropPinsDisplay)
+        self._pinButtonDelegate.pinClicked.connect(self.onPinConfiguration)
         clear_button.released.connect(self.clear)
         print_button.released.connect(self.print)
         close_button.released.connect(self.accept)
         upload_button.released.connect(self.upload)
 
-    # __________________________________________________________________
-    def _parsePropData(self, message):
-
-        variables = {}
-        data = message[5:]
-        vars = re.split(self._reDataSplitValues, data)[1:]
-
-        try:
-            m = re.findall(self._reDataVariables, data)
-            if m:
-                i = 0
-                for var in m:
-                    variables[var] = vars[i].strip()
-                    i = i + 1
-        except Exception as e:
-            self._logger.debug(e)
-
-        self.propDataReveived.emit(variables)
-
     # __________________________________________________________________
     def _readJson(self):
 
@@ -235,14 +235,13 @@ class WiringDialog(AppletDialog):
                 with open(self._localFile, 'r', encoding='utf-8') as fp:
                     json_list = json.load(fp)
                 for p in json_list:
-                    try:
-                        key = self.pinToKey(p['pin'])
-                        if key is not None:
-                            self._propPins[key] = PropPin(key, p['variable'], p['initial'], p['alias'])
-                            self._logger.info("Pin added from wiring : {}".format(p))
-                    except Exception as e:
+                    key = self.pinToKey(p.get('pin')) if isinstance(p, dict) else None
+                    pin = PropPin.fromJson(p, key) if key is not None else None
+                    if pin is not None:
+                        self._propPins[key] = pin
+                        self._logger.info("Pin added from wiring : {}".format(p))
+                    else:
                         self._logger.warning("Failed add pin from wiring : {}".format(p))
-                        self._logger.warning(e)
             except json.JSONDecodeError as jex:
                 self._logger.error("JSONDecodeError '{}' at {} in: {}".format(jex.msg, jex.pos, jex.doc))
             except Exception as e:
@@ -255,12 +254,7 @@ class WiringDialog(AppletDialog):
         pin_list = []
         for key, pin in self._boardPins:
             if key in self._propPins:
-                pin_dict = {}
-                pin_dict['pin'] = pin
-                pin_dict['variable'] = self._propPins[key]._variable
-                pin_dict['initial'] = self._propPins[key]._initial
-                pin_dict['alias'] = self._propPins[key]._alias
-                pin_list.append(pin_dict)
+                pin_list.append(self._propPins[key].replace(pin=pin).toDict())
 
         with open(self._localFile, 'w', encoding='utf-8') as fp:
             fp.write(json.dumps(pin_list, indent=2, ensure_ascii=False))  # for UTF-8 encoding
@@ -280,6 +274,7 @@ class WiringDialog(AppletDialog):
             self._propPins = {}
             self._saveJson()
             self.reloadPropPinsDisplay.emit()
+            self.wiringChanged.emit(self.wiringPins())
 
     # __________________________________________________________________
     def closeEvent(self, e):
@@ -335,16 +330,11 @@ class WiringDialog(AppletDialog):
                 else:
                     self._led.switchOn('green')
 
-        if 'prop_outbox' in self._propSettings['prop']:
-            if topic == self._propSettings['prop']['prop_outbox'] and message.startswith('DATA '):
-                self._parsePropData(message)
-
     # __________________________________________________________________
-    @pyqtSlot()
-    def onPinConfiguration(self):
+    @pyqtSlot(QModelIndex)
+    def onPinConfiguration(self, index):
 
-        s = self.sender()
-        pin_key = s.text().strip()
+        pin_key = self._pinsModel.pinKey(index)
 
         if pin_key in self._propPins:
             pin = self._propPins[pin_key]
@@ -365,9 +355,12 @@ class WiringDialog(AppletDialog):
         dlg.setModal(True)
         dlg.move(self.pos() + QPoint(130, 100))
         ret = dlg.exec()
+        pin = dlg.getPropPin()
+        changed_keys = [pin_key]  # the dialog removes pin_key when the pin is moved to another output
         if ret == QDialog.Accepted:
             if pin is not None:
                 self._propPins[pin.getPin()] = pin
+                changed_keys.append(pin.getPin())
         elif ret == -1:
             pin_to_remove = pin.getPin()
             if pin_to_remove in self._propPins:
@@ -379,9 +372,12 @@ class WiringDialog(AppletDialog):
                 msg.setStandardButtons(QMessageBox.Yes | QMessageBox.No)
                 if msg.exec_() == QMessageBox.Yes:
                     self._propPins.pop(pin_to_remove)
+            changed_keys.append(pin_to_remove)
 
         self._saveJson()
-        self.reloadPropPinsDisplay.emit()
+        for key in set(changed_keys):
+            self._pinsModel.pinChanged(key)
+        self.wiringChanged.emit(self.wiringPins())
 
     # __________________________________________________________________
     @pyqtSlot()
@@ -418,44 +414,13 @@ class WiringDialog(AppletDialog):
 
         self._readJson()
         self.reloadPropPinsDisplay.emit()
+        self.wiringChanged.emit(self.wiringPins())
 
     # __________________________________________________________________
     @pyqtSlot()
     def onReloadPropPinsDisplay(self):
 
-        while self._pinsGridLayout.count():
-            layout_item = self._pinsGridLayout.takeAt(0)
-            if layout_item.widget():
-                layout_item.widget().deleteLater()
-            if layout_item.layout():
-                layout_item.layout().deleteLater()
-            del layout_item
-
-        self._pinsGridLayout.addWidget(QLabel(self.tr("Output")), self._pinsGridLayout.rowCount(), 0, Qt.AlignHCenter)
-        self._pinsGridLayout.addWidget(QLabel(self.tr("Variable")), self._pinsGridLayout.rowCount() - 1, 1,
-                                       Qt.AlignHCenter)
-        self._pinsGridLayout.addWidget(QLabel(self.tr("Initial")), self._pinsGridLayout.rowCount() - 1, 2,
-                                       Qt.AlignHCenter)
-        self._pinsGridLayout.addWidget(QLabel(self.tr("HIGH")), self._pinsGridLayout.rowCount() - 1, 3, Qt.AlignHCenter)
-        self._pinsGridLayout.addWidget(QLabel(self.tr("LOW")), self._pinsGridLayout.rowCount() - 1, 4, Qt.AlignHCenter)
-
-        for p, _ in self._boardPins:
-            button = QPushButton(" {} ".format(p))
-            button.released.connect(self.onPinConfiguration)
-            if p in self._propPins:
-                variable = self._propPins[p].getVariable()
-                if self._propPins[p].getInitial() == GPIO_HIGH:
-                    initial = 'HIGH'
-                else:
-                    initial = 'LOW'
-                alias_high, alias_low = self._propPins[p].getAlias()
-            else:
-                variable, initial, alias_high, alias_low = ['-'] * 4
-            self._pinsGridLayout.addWidget(button, self._pinsGridLayout.rowCount(), 0)
-            self._pinsGridLayout.addWidget(QLabel(variable), self._pinsGridLayout.rowCount() - 1, 1, Qt.AlignHCenter)
-            self._pinsGridLayout.addWidget(QLabel(initial), self._pinsGridLayout.rowCount() - 1, 2, Qt.AlignHCenter)
-            self._pinsGridLayout.addWidget(QLabel(alias_high), self._pinsGridLayout.rowCount() - 1, 3, Qt.AlignHCenter)
-            self._pinsGridLayout.addWidget(QLabel(alias_low), self._pinsGridLayout.rowCount() - 1, 4, Qt.AlignHCenter)
+        self._pinsModel.setWiring(self._boardPins, self._propPins)
 
     # __________________________________________________________________
     def pinsByVariable(self):
@@ -474,6 +439,16 @@ class WiringDialog(AppletDialog):
                 return key
         return None
 
+    # __________________________________________________________________
+    def wiringPins(self):
+
+        # PropPin in wiring JSON order (binary protocol pin indexes), None for a null pin
+        pins = []
+        for key, pin in self._boardPins:
+            if key in self._propPins:
+                pins.append(None if self._propPins[key].isNull() else self._propPins[key].replace(pin=pin))
+        return pins
+
     # __________________________________________________________________
     @pyqtSlot()
     def print(self):
@@ -524,15 +499,11 @@ class WiringDialog(AppletDialog):
         pin_list = []
         for key, pin in self._boardPins:
             if key in self._propPins:
-                pin_dict = {}
-                pin_dict['pin'] = pin
-                pin_dict['variable'] = self._propPins[key]._variable
-                pin_dict['initial'] = self._propPins[key]._initial
-                pin_dict['alias'] = self._propPins[key]._alias
-                pin_list.append(pin_dict)
+                pin_list.append(self._propPins[key].replace(pin=pin).toDict())
 
         wiring = json.dumps(pin_list, ensure_ascii=False)
         self.publishRetainedMessage.emit(self._propSettings['prop']['prop_wiring'], wiring)
+        self.wiringChanged.emit(self.wiringPins())
 
     # __________________________________________________________________
     @pyqtSlot()
@@ -552,13 +523,15 @@ class WiringDialog(AppletDialog):
             if key in self._propPins:
                 pin_dict = {}
                 pin_dict['p'] = int(pin[1:])  # integer (for Pi it's string)
-                pin_dict['v'] = self._propPins[key]._variable
-                pin_dict['i'] = self._propPins[key]._initial
-                pin_dict['a'] = self._propPins[key]._alias
+                pin_dict['v'] = self._propPins[key].getVariable()
+                pin_dict['i'] = self._propPins[key].getInitial()
+                pin_dict['a'] = self._propPins[key].getAlias()
                 pin_json = json.dumps(pin_dict, ensure_ascii=False)
                 pin_topic = self._propSettings['prop']['prop_wiring'] + '/' + pin
                 self.publishRetainedMessage.emit(pin_topic, pin_json)
 
+        self.wiringChanged.emit(self.wiringPins())
+
     # __________________________________________________________________
     @pyqtSlot()
     def uploadFullMega(self):
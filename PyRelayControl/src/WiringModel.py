@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+WiringModel.py
+MIT License (c) Faure Systems <dev at faure dot systems>
+
+Table model of the prop wiring, one row per board pin:
+Output, Variable, Initial, HIGH and LOW.
+
+The model reads the wiring dict owned by WiringDialog (board pin key -> PropPin),
+pinChanged() notifies the view of a single pin edit and setWiring() resets the
+whole table when the board or the wiring file changes.
+"""
+
+from constants import *
+
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, QVariant
+
+COLUMN_OUTPUT = 0
+COLUMN_VARIABLE = 1
+COLUMN_INITIAL = 2
+COLUMN_HIGH = 3
+COLUMN_LOW = 4
+
+
+class WiringModel(QAbstractTableModel):
+
+    # __________________________________________________________________
+    def __init__(self, parent=None):
+
+        super().__init__(parent)
+
+        self._boardPins = []
+        self._propPins = {}
+        self._rows = {}  # board pin key -> row
+        self._headers = [self.tr("Output"), self.tr("Variable"), self.tr("Initial"), self.tr("HIGH"),
+                         self.tr("LOW")]
+
+    # __________________________________________________________________
+    def columnCount(self, parent=QModelIndex()):
+
+        return 0 if parent.isValid() else len(self._headers)
+
+    # __________________________________________________________________
+    def data(self, index, role=Qt.DisplayRole):
+
+        if not index.isValid():
+            return QVariant()
+
+        if role == Qt.TextAlignmentRole:
+            return Qt.AlignCenter
+
+        if role != Qt.DisplayRole:
+            return QVariant()
+
+        key = self._boardPins[index.row()][0]
+        column = index.column()
+        if column == COLUMN_OUTPUT:
+            return key
+        if key not in self._propPins:
+            return '-'
+        pin = self._propPins[key]
+        if column == COLUMN_VARIABLE:
+            return pin.getVariable()
+        if column == COLUMN_INITIAL:
+            return 'HIGH' if pin.getInitial() == GPIO_HIGH else 'LOW'
+        alias_high, alias_low = pin.getAlias()
+        return alias_high if column == COLUMN_HIGH else alias_low
+
+    # __________________________________________________________________
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self._headers[section]
+        return QVariant()
+
+    # __________________________________________________________________
+    def pinChanged(self, key):
+
+        if key in self._rows:
+            row = self._rows[key]
+            self.dataChanged.emit(self.index(row, COLUMN_VARIABLE), self.index(row, COLUMN_LOW),
+                                  [Qt.DisplayRole])
+
+    # __________________________________________________________________
+    def pinKey(self, index):
+
+        return self._boardPins[index.row()][0] if index.isValid() else None
+
+    # __________________________________________________________________
+    def rowCount(self, parent=QModelIndex()):
+
+        return 0 if parent.isValid() else len(self._boardPins)
+
+    # __________________________________________________________________
+    def setWiring(self, board_pins, prop_pins):
+
+        self.beginResetModel()
+        self._boardPins = board_pins
+        self._propPins = prop_pins
+        self._rows = {key: row for row, (key, _) in enumerate(board_pins)}
+        self.endResetModel()
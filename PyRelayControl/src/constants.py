@@ -20,6 +20,7 @@ PYPROPS_CORELIBPATH = '../core' # however ./core is preferred if present
 MQTT_DEFAULT_HOST = 'localhost'  # replace localhost with your broker IP address
 MQTT_DEFAULT_PORT = 1883
 MQTT_DEFAULT_QoS = 1
+MQTT_BINARY_SUFFIX = '/bin'  # topic suffix of the compact binary protocol (see RelayBinary.py)
 
 # __________________________________________________________________
 # Required by RelayApplet
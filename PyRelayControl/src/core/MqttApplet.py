@@ -48,7 +48,9 @@ from PyQt5.QtWidgets import QApplication
 class MqttApplet(QApplication):
     connectedToMqttBroker = pyqtSignal()
     disconnectedToMqttBroker = pyqtSignal()
+    binaryMessageReceived = pyqtSignal(str, bytes)
     messageReceived = pyqtSignal(str, str)
+    publishBinaryMessage = pyqtSignal(str, bytes)
     publishMessage = pyqtSignal(str, str)
 
     # __________________________________________________________________
@@ -61,10 +63,12 @@ class MqttApplet(QApplication):
         self.setOrganizationName(ORGANIZATIONNAME)
 
         self.publishMessage.connect(self._onPublishMessage)
+        self.publishBinaryMessage.connect(self._onPublishBinaryMessage)
 
         self._config = {}
         self._definitions = {}
         self._mqttSubscriptions = []
+        self._mqttBinarySubscriptions = []  # payloads emitted undecoded with binaryMessageReceived
         self._mqttServerHost = MQTT_DEFAULT_HOST
         self._mqttServerPort = MQTT_DEFAULT_PORT
         self._publishable = []
@@ -166,7 +170,7 @@ class MqttApplet(QApplication):
             # self._logger.debug("Connected to MQTT server with flags: ", flags) # flags is dict
             self._logger.info(self.tr("Program connected to MQTT server"))
             self.connectedToMqttBroker.emit()
-            for topic in self._mqttSubscriptions:
+            for topic in self._mqttSubscriptions + self._mqttBinarySubscriptions:
                 try:
                     (result, mid) = self._mqttClient.subscribe(topic, MQTT_DEFAULT_QoS)
                     self._logger.info("{0} (mid={1}) : {2}".format(self.tr("Program subscribing to topic"), mid, topic))
@@ -223,6 +227,11 @@ class MqttApplet(QApplication):
     # __________________________________________________________________
     def _mqttOnMessage(self, client, userdata, msg):
 
+        if msg.topic in self._mqttBinarySubscriptions:
+            self._logger.info(self.tr("Binary message received : ") + msg.payload.hex() + self.tr(" in ") + msg.topic)
+            self.binaryMessageReceived.emit(msg.topic, msg.payload)
+            return
+
         message = None
         try:
             message = msg.payload.decode(encoding="utf-8", errors="strict")
@@ -256,6 +265,23 @@ class MqttApplet(QApplication):
         self._logger.info("{0} (mid={1})".format(self.tr("Program has been unsusbcribed from topic"), mid))
 
 
+    # __________________________________________________________________
+    @pyqtSlot(str, bytes)
+    def _onPublishBinaryMessage(self, topic, payload):
+
+        if self._mqttConnected:
+            try:
+                (result, mid) = self._mqttClient.publish(topic, payload, qos=MQTT_DEFAULT_QoS, retain=False)
+                self._logger.info(
+                    "{0} {1} (mid={2}) on {3}".format(self.tr("Program sending binary message"), payload.hex(), mid,
+                                                      topic))
+            except Exception as e:
+                self._logger.error(
+                    "{0} {1}".format(self.tr("MQTT API : failed to call publish() for binary message on"), topic))
+                self._logger.debug(e)
+        else:
+            self._logger.info(self.tr("Program failed to send binary message (disconnected)"))
+
     # __________________________________________________________________
     @pyqtSlot(str, str)
     def _onPublishMessage(self, topic, message):
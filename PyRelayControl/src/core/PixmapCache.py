@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+PixmapCache.py
+MIT License (c) Faure Systems <dev at faure dot systems>
+
+Process-wide cache of rasterized icons keyed by (image, size, device pixel ratio):
+    PixmapCache.preload(images, QSize(20, 20))     # at startup, once QApplication exists
+    label.setPixmap(PixmapCache.pixmap(image, QSize(20, 20)))
+SVG files are loaded in one QIcon per image and rendered once per size and ratio.
+"""
+
+from PyQt5.QtCore import QSize
+from PyQt5.QtGui import QGuiApplication, QIcon
+
+_icons = {}
+_pixmaps = {}
+
+
+# __________________________________________________________________
+def pixmap(image, size, ratio=None):
+    """Return the QPixmap of image at size (QSize) for ratio, the application one by default."""
+    if ratio is None:
+        ratio = QGuiApplication.instance().devicePixelRatio()
+    key = (image, size.width(), size.height(), ratio)
+    p = _pixmaps.get(key)
+    if p is None:
+        icon = _icons.get(image)
+        if icon is None:
+            icon = QIcon(image)
+            _icons[image] = icon
+        p = icon.pixmap(QSize(round(size.width() * ratio), round(size.height() * ratio)))
+        p.setDevicePixelRatio(ratio)
+        _pixmaps[key] = p
+    return p
+
+
+# __________________________________________________________________
+def preload(images, size, ratio=None):
+    for image in images:
+        pixmap(image, size, ratio)
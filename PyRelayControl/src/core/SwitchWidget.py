@@ -5,14 +5,23 @@ SwitchWidget.py
 MIT License (c) Faure Systems <dev at faure dot systems>
 
 Prop switch widget.
+
+State images come from the process-wide PixmapCache and are set only when the
+displayed state changes.
 """
 
 from PyQt5.QtWidgets import QWidget, QLabel, QHBoxLayout, QSizePolicy
 from PyQt5.QtCore import Qt, pyqtSignal, pyqtSlot, QSize
-from PyQt5.QtGui import QIcon
 
 import os
 
+import PixmapCache
+
+IMAGE_SIZE = QSize(20, 20)
+BUTTON_SIZE = QSize(32, 18)
+BUTTON_ON = os.path.dirname(os.path.abspath(__file__)) + '/images/switch-on.svg'
+BUTTON_OFF = os.path.dirname(os.path.abspath(__file__)) + '/images/switch-off.svg'
+
 
 class SwitchWidget(QWidget):
     publishMessage = pyqtSignal(str, str)
@@ -38,8 +47,9 @@ class SwitchWidget(QWidget):
         self._variable = variable
         self._value_on = value_on
         self._value_off = value_off
-        self._image_on = QIcon(image_on)
-        self._image_off = QIcon(image_off)
+        self._images = (image_on, image_off)
+        self._image_on = PixmapCache.pixmap(image_on, IMAGE_SIZE)
+        self._image_off = PixmapCache.pixmap(image_off, IMAGE_SIZE)
         self._sync = sync
         self._sync_on = sync_on
         self._sync_off = sync_off
@@ -71,11 +81,13 @@ class SwitchWidget(QWidget):
 
         self.setLayout(main_layout)
 
-        self._button_on = QIcon(os.path.dirname(os.path.abspath(__file__)) + '/images/switch-on.svg')
-        self._button_off = QIcon(os.path.dirname(os.path.abspath(__file__)) + '/images/switch-off.svg')
+        self._button_on = PixmapCache.pixmap(BUTTON_ON, BUTTON_SIZE)
+        self._button_off = PixmapCache.pixmap(BUTTON_OFF, BUTTON_SIZE)
 
-        self._dataImage.setPixmap(self._image_off.pixmap(QSize(20, 20)))
-        self._buttonImage.setPixmap(self._button_off.pixmap(QSize(32, 18)))
+        self._dataImage.setPixmap(self._image_off)
+        self._buttonImage.setPixmap(self._button_off)
+        self._dataOn = False  # displayed images
+        self._buttonOn = False
         self._buttontoggled = False
 
     # __________________________________________________________________
@@ -93,15 +105,45 @@ class SwitchWidget(QWidget):
     def onDataReceived(self, variables):
 
         if self._variable in variables:
-            if variables[self._variable] == self._value_on:
-                self._dataImage.setPixmap(self._image_on.pixmap(QSize(20, 20)))
-            else:
-                self._dataImage.setPixmap(self._image_off.pixmap(QSize(20, 20)))
-
-        if self._sync in variables:
-            if variables[self._sync] == self._sync_on:
-                self._buttonImage.setPixmap(self._button_on.pixmap(QSize(32, 18)))
-                self._buttontoggled = True
-            else:
-                self._buttonImage.setPixmap(self._button_off.pixmap(QSize(32, 18)))
-                self._buttontoggled = False
+            self.updateValue(self._variable, variables[self._variable])
+        if self._sync != self._variable and self._sync in variables:
+            self.updateValue(self._sync, variables[self._sync])
+
+    # __________________________________________________________________
+    def setImages(self, image_on, image_off):
+
+        if (image_on, image_off) == self._images:
+            return
+        self._images = (image_on, image_off)
+        self._image_on = PixmapCache.pixmap(image_on, IMAGE_SIZE)
+        self._image_off = PixmapCache.pixmap(image_off, IMAGE_SIZE)
+        self._dataImage.setPixmap(self._image_on if self._dataOn else self._image_off)
+
+    # __________________________________________________________________
+    def setLabel(self, label):
+
+        self._dataLabel.setText(label + ' : ')
+
+    # __________________________________________________________________
+    def updateValue(self, variable, value):
+
+        if variable == self._variable:
+            on = value == self._value_on
+            if on != self._dataOn:
+                self._dataOn = on
+                self._dataImage.setPixmap(self._image_on if on else self._image_off)
+
+        if variable == self._sync:
+            on = value == self._sync_on
+            self._buttontoggled = on
+            if on != self._buttonOn:
+                self._buttonOn = on
+                self._buttonImage.setPixmap(self._button_on if on else self._button_off)
+
+    # __________________________________________________________________
+    def variables(self):
+
+        # variables updating the widget
+        if self._sync == self._variable:
+            return (self._variable,)
+        return (self._variable, self._sync)
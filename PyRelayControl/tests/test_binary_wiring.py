@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+test_binary_wiring.py
+MIT License (c) Faure Systems <dev at faure dot systems>
+
+Binary commands must not be sent with the pin indexes of a wiring edited in
+WiringDialog and not uploaded to the prop yet.
+
+Run from PyRelayControl: python -m unittest discover tests
+"""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+
+WIRING = [{'pin': 'GPIO4', 'variable': 'light', 'initial': 0, 'alias': ['on', 'off']},
+          {'pin': 'GPIO5', 'variable': 'door', 'initial': 0, 'alias': ['open', 'closed']}]
+
+
+class BinaryWiringTest(unittest.TestCase):
+
+    # __________________________________________________________________
+    @classmethod
+    def setUpClass(cls):
+
+        # the applet reads and writes its settings and wiring files in the current directory
+        cls._cwd = os.getcwd()
+        cls._dir = tempfile.mkdtemp()
+        src = os.path.join(cls._dir, 'src')
+        shutil.copytree(SRC, src, ignore=shutil.ignore_patterns('__pycache__', '.*.yml', 'prop.ini', '*.json'))
+        os.chdir(src)
+        sys.path[:0] = [src, os.path.join(src, 'core')]
+
+        with open('prop.ini', 'w') as fp:
+            fp.write("[prop]\nboard = pi\nprop_name = Relay\nprop_inbox = P/inbox\nprop_outbox = P/outbox\n"
+                     "prop_wiring = P/wiring\nbroker_address = 127.0.0.1\nbroker_port = 1\n"
+                     "[options]\nbinary_protocol = 1\n")
+        with open('raspberry_pi.json', 'w') as fp:
+            json.dump(WIRING, fp)
+
+        from RelayApplet import RelayApplet
+        client = mock.MagicMock()  # no broker, messages are caught on the applet signals
+        client.publish.return_value = (0, 1)
+        client.subscribe.return_value = (0, 1)
+        with mock.patch.object(sys, 'argv', [sys.argv[0]]):
+            cls._app = RelayApplet(sys.argv, client)
+
+    # __________________________________________________________________
+    @classmethod
+    def tearDownClass(cls):
+
+        os.chdir(cls._cwd)
+        shutil.rmtree(cls._dir, ignore_errors=True)
+
+    # __________________________________________________________________
+    def _command(self, message):
+
+        # published (topic, payload) of a switch command
+        published = []
+        append = lambda topic, payload: published.append((topic, payload))
+        self._app.publishMessage.connect(append)
+        self._app.publishBinaryMessage.connect(append)
+        try:
+            self._app._panelDialog.onCommandMessage('P/inbox', message)
+        finally:
+            self._app.publishMessage.disconnect(append)
+            self._app.publishBinaryMessage.disconnect(append)
+        return published
+
+    # __________________________________________________________________
+    def _propData(self, variables, levels):
+
+        # binary DATA frame of a prop wired with variables
+        from RelayBinary import encodeData, wiringTag
+        self._app.binaryMessageReceived.emit('P/outbox/bin', encodeData(levels, wiringTag(variables)))
+
+    # __________________________________________________________________
+    def test_local_edit_not_uploaded(self):
+
+        from PropPin import PropPin
+        from PyQt5.QtWidgets import QDialog
+        from RelayBinary import decodeCommand, wiringTag
+
+        panel = self._app._panelDialog
+        wiring = self._app._wiringDialog
+
+        # the prop has the local wiring: light is pin index 0
+        self._propData(['light', 'door'], [0, 0])
+        published = self._command('light:1')
+        self.assertEqual(published[0][0], 'P/inbox/bin')
+        self.assertEqual(decodeCommand(published[0][1]).indexes, [0])
+
+        # a fan wired on GPIO2 in the control moves light to index 1, not uploaded
+        dialog = mock.MagicMock()
+        dialog.return_value.exec.return_value = QDialog.Accepted
+        dialog.return_value.getPropPin.return_value = PropPin('GPIO2 (SDA)', 'fan', 0, ('on', 'off'))
+        with mock.patch('WiringDialog.PropPinDialog', dialog):
+            wiring.onPinConfiguration(wiring._pinsModel.index(0, 0))
+        self.assertEqual([pin.getVariable() for pin in panel._wiringPins], ['fan', 'light', 'door'])
+
+        # index 1 is door on the prop, the command is sent as text
+        self.assertEqual(self._command('light:1'), [('P/inbox', 'light:1')])
+
+        # the prop DATA of the previous wiring is not decoded with the new indexes
+        self._propData(['light', 'door'], [0, 1])
+        self.assertNotEqual(self._app._propState.value('light'), 'on')
+
+        # once uploaded and acknowledged by the prop, binary commands use the new indexes
+        with mock.patch.object(wiring, 'publishRetainedMessage'):
+            wiring.upload()
+        self._propData(['fan', 'light', 'door'], [0, 0, 0])
+        published = self._command('light:1')
+        command = decodeCommand(published[0][1])
+        self.assertEqual(command.indexes, [1])
+        self.assertEqual(command.tag, wiringTag(['fan', 'light', 'door']))
+
+
+if __name__ == '__main__':
+    unittest.main()